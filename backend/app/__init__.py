@@ -3,7 +3,9 @@ from flask_cors import CORS
 from flask_migrate import Migrate
 from .models import db
 from .api import bp as api_bp
+from .cli import export_command
 from .config import Config
+from .options import FEATURES
 
 def create_app(config=None):
     app = Flask(__name__)
@@ -15,6 +17,11 @@ def create_app(config=None):
     if config:
         app.config.update(config)
     
+    # Analyses use these unless their options say otherwise; fail now, not mid-analysis
+    unknown = [feature for feature in app.config['ANALYSIS_FEATURES'] if feature not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown ANALYSIS_FEATURES {', '.join(unknown)}; choose from {', '.join(FEATURES)}")
+    
     # Initialize extensions
     CORS(app)
     db.init_app(app)
@@ -22,5 +29,6 @@ def create_app(config=None):
     
     # Register blueprints
     app.register_blueprint(api_bp, url_prefix='/api')
+    app.cli.add_command(export_command)
     
     return app
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 bp = Blueprint('api', __name__)
 
-from . import analysis, tracks  # noqa
+from . import admin, analysis, export, tracks  # noqa
@@ -0,0 +1,31 @@
+import hmac
+import os
+from functools import wraps
+from flask import current_app, jsonify, request, send_file
+from . import bp
+from ..models import Analysis
+
+def admin_required(view):
+    """Require the configured ADMIN_TOKEN in the X-Admin-Token header."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        token = current_app.config.get('ADMIN_TOKEN')
+        supplied = request.headers.get('X-Admin-Token', '')
+        if not token or not hmac.compare_digest(supplied, token):
+            return jsonify({'error': 'Admin token required'}), 403
+        return view(*args, **kwargs)
+    return wrapped
+
+@bp.route('/admin/analysis/<int:analysis_id>/profile', methods=['GET'])
+@admin_required
+def get_analysis_profile(analysis_id):
+    analysis = Analysis.query.get_or_404(analysis_id)
+    
+    if not analysis.profile_path or not os.path.exists(analysis.profile_path):
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    return send_file(
+        analysis.profile_path,
+        as_attachment=True,
+        download_name=os.path.basename(analysis.profile_path)
+    )
@@ -1,25 +1,50 @@
-from flask import jsonify, request
+import os
+import shutil
+from datetime import datetime
+from flask import Response, current_app, jsonify, request, send_file
 from . import bp
+from .. import metrics
 from ..models import Analysis, db
-from ..tasks import process_audio_url
+from ..peak_files import level_path, read_index
+from ..options import validate_options
+from ..signatures import probe_analysis, process_audio_increment
 
 @bp.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'FlacJacket API is running'}), 200
 
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    body, content_type = metrics.render_latest()
+    return Response(body, content_type=content_type)
+
+def enqueue_analysis(analysis):
+    """Start processing; batch jobs are probed first and then scheduled by duration."""
+    if (analysis.options or {}).get('incremental'):
+        process_audio_increment.delay(analysis.id)
+    else:
+        probe_analysis.delay(analysis.id)
+
 @bp.route('/analysis', methods=['POST'])
 def start_analysis():
     data = request.get_json()
     if not data or 'url' not in data:
         return jsonify({'error': 'URL is required'}), 400
     
+    options = data.get('options') or {}
+    error = validate_options(options)
+    if error:
+        return jsonify({'error': error}), 400
+    
     url = data['url']
-    analysis = Analysis(url=url)
+    client_id = request.headers.get('X-Client-Id') or request.remote_addr
+    analysis = Analysis(url=url, options=options, client_id=client_id)
     db.session.add(analysis)
     db.session.commit()
     
     # Start async task
-    process_audio_url.delay(analysis.id)
+    enqueue_analysis(analysis)
+    metrics.ANALYSES_SUBMITTED.inc()
     
     return jsonify(analysis.to_dict()), 202
 
@@ -28,6 +53,60 @@ def get_analysis(analysis_id):
     analysis = Analysis.query.get_or_404(analysis_id)
     return jsonify(analysis.to_dict())
 
+@bp.route('/analysis/<int:analysis_id>/retry', methods=['POST'])
+def retry_analysis(analysis_id):
+    """Re-run a failed analysis, resuming from its last checkpoint."""
+    analysis = Analysis.query.get_or_404(analysis_id)
+    if analysis.status != 'failed':
+        return jsonify({'error': 'Only failed analyses can be retried'}), 409
+    
+    analysis.status = 'pending'
+    analysis.error_message = None
+    analysis.started_at = None
+    analysis.dispatched_at = None
+    analysis.completed_at = None
+    analysis.duration = None
+    analysis.checkpoint = {**(analysis.checkpoint or {}), 'attempts': 0}
+    db.session.commit()
+    
+    enqueue_analysis(analysis)
+    return jsonify(analysis.to_dict()), 202
+
+@bp.route('/analysis/<int:analysis_id>/finalize', methods=['POST'])
+def finalize_analysis(analysis_id):
+    """Mark a live recording as complete; the next increment closes the tracklist."""
+    analysis = Analysis.query.get_or_404(analysis_id)
+    if not (analysis.options or {}).get('incremental') or analysis.status not in ('pending', 'live'):
+        return jsonify({'error': 'Analysis is not live'}), 409
+    
+    # Its own column, so a running increment saving its checkpoint can't drop the request
+    if not analysis.finalize_requested_at:
+        analysis.finalize_requested_at = datetime.utcnow()
+    db.session.commit()
+    return jsonify(analysis.to_dict()), 202
+
+def peaks_folder(analysis_id):
+    return os.path.join(current_app.config['PEAKS_FOLDER'], str(analysis_id))
+
+@bp.route('/analysis/<int:analysis_id>/peaks', methods=['GET'])
+def get_peaks_index(analysis_id):
+    """Sample rate, sample format and zoom levels of the waveform peaks."""
+    Analysis.query.get_or_404(analysis_id)
+    index = read_index(peaks_folder(analysis_id))
+    if index is None:
+        return jsonify({'error': 'Peaks not found'}), 404
+    return jsonify(index)
+
+@bp.route('/analysis/<int:analysis_id>/peaks/<int:level>', methods=['GET'])
+def get_peaks(analysis_id, level):
+    """Raw (min, max) pairs for one zoom level; supports Range requests."""
+    Analysis.query.get_or_404(analysis_id)
+    path = level_path(peaks_folder(analysis_id), level)
+    if not os.path.exists(path):
+        return jsonify({'error': 'Peaks not found'}), 404
+    
+    return send_file(path, mimetype='application/octet-stream', conditional=True, max_age=0)
+
 @bp.route('/analyses', methods=['GET'])
 def list_analyses():
     analyses = Analysis.query.order_by(Analysis.created_at.desc()).all()
@@ -36,6 +115,12 @@ def list_analyses():
 @bp.route('/analysis/<int:analysis_id>', methods=['DELETE'])
 def delete_analysis(analysis_id):
     analysis = Analysis.query.get_or_404(analysis_id)
+    profile_path = analysis.profile_path
     db.session.delete(analysis)
     db.session.commit()
+    shutil.rmtree(peaks_folder(analysis_id), ignore_errors=True)
+    # Failed analyses keep their decoded source and checkpoints for a retry
+    shutil.rmtree(os.path.join(current_app.config['WORK_FOLDER'], str(analysis_id)), ignore_errors=True)
+    if profile_path and os.path.exists(profile_path):
+        os.remove(profile_path)
     return jsonify({'status': 'success', 'message': 'Analysis deleted successfully'})
@@ -0,0 +1,28 @@
+from datetime import datetime
+from flask import Response, current_app, jsonify, request, stream_with_context
+from . import bp
+from ..export import EXPORT_FORMATS, EXTENSIONS, export_analyses
+
+@bp.route('/export', methods=['GET'])
+def export():
+    """Stream analyses and their tracks as NDJSON, Parquet or an Arrow IPC stream.
+
+    Filters: status (comma separated), since and until (ISO 8601, on created_at).
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    statuses = [status for status in request.args.get('status', '').split(',') if status]
+    try:
+        since, until = (datetime.fromisoformat(request.args[name]) if request.args.get(name) else None
+                        for name in ('since', 'until'))
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO 8601 dates'}), 400
+    
+    chunks = export_analyses(fmt, statuses, since, until, current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f"attachment; filename=analyses.{EXTENSIONS[fmt]}"},
+    )
@@ -0,0 +1,16 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from .export import EXPORT_FORMATS, export_analyses
+
+@click.command('export')
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', show_default=True)
+@click.option('--status', 'statuses', multiple=True, help='Only analyses with this status; repeatable.')
+@click.option('--since', type=click.DateTime(), help='Only analyses created at or after this time.')
+@click.option('--until', type=click.DateTime(), help='Only analyses created before this time.')
+@click.option('--output', '-o', type=click.File('wb'), default='-', help='Output file, stdout by default.')
+@with_appcontext
+def export_command(fmt, statuses, since, until, output):
+    """Export analyses and their tracks, streamed in batches."""
+    for chunk in export_analyses(fmt, statuses, since, until, current_app.config['EXPORT_BATCH_SIZE']):
+        output.write(chunk)
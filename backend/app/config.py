@@ -13,7 +13,65 @@ class Config:
     # Celery configuration
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL') or 'redis://localhost:6379/0'
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND') or 'redis://localhost:6379/0'
+    # Tasks are acknowledged late, so the broker must not redeliver a long mix
+    # to a second worker while the first is still processing it
+    CELERY_VISIBILITY_TIMEOUT = int(os.environ.get('CELERY_VISIBILITY_TIMEOUT') or 12 * 60 * 60)
+    # Give up on a job after it has been interrupted this many times
+    TASK_MAX_ATTEMPTS = int(os.environ.get('TASK_MAX_ATTEMPTS') or 3)
     
     # Upload configuration
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max file size
+    
+    # Analysis configuration
+    # Audio is decoded once, straight to this rate, and analysed without resampling
+    ANALYSIS_SAMPLE_RATE = int(os.environ.get('ANALYSIS_SAMPLE_RATE') or 22050)
+    ANALYSIS_RES_TYPE = os.environ.get('ANALYSIS_RES_TYPE') or 'soxr_hq'  # fallback if rates differ
+    ANALYSIS_MONO = os.environ.get('ANALYSIS_MONO', 'true').lower() == 'true'
+    # Per-track features computed alongside onsets: tempo, key, loudness, centroid
+    ANALYSIS_FEATURES = tuple(feature.strip() for feature in os.environ.get(
+        'ANALYSIS_FEATURES', 'tempo,key,loudness,centroid').split(',') if feature.strip())
+    
+    # Tracks from source chapters or description tracklists: 'skip' audio analysis,
+    # 'refine' their boundaries within METADATA_REFINE_WINDOW seconds, or 'ignore' them
+    METADATA_SEGMENTATION = os.environ.get('METADATA_SEGMENTATION') or 'skip'
+    METADATA_REFINE_WINDOW = float(os.environ.get('METADATA_REFINE_WINDOW') or 10)
+    
+    # Incremental analysis of live or growing recordings
+    WORK_FOLDER = os.path.join(UPLOAD_FOLDER, 'work')  # per-analysis source audio and checkpoints
+    INCREMENTAL_POLL_INTERVAL = int(os.environ.get('INCREMENTAL_POLL_INTERVAL') or 120)  # seconds
+    # Finalize once the recording hasn't grown for this many polls
+    INCREMENTAL_MAX_IDLE_POLLS = int(os.environ.get('INCREMENTAL_MAX_IDLE_POLLS') or 15)
+    
+    # Waveform peak pyramids: level n has PEAKS_SAMPLES_PER_PEAK * PEAKS_FACTOR**n
+    # samples per (min, max) pair, stored as PEAKS_BITS-bit integers
+    PEAKS_FOLDER = os.path.join(UPLOAD_FOLDER, 'peaks')
+    PEAKS_SAMPLES_PER_PEAK = int(os.environ.get('PEAKS_SAMPLES_PER_PEAK') or 256)
+    PEAKS_LEVELS = int(os.environ.get('PEAKS_LEVELS') or 6)
+    PEAKS_FACTOR = int(os.environ.get('PEAKS_FACTOR') or 4)
+    PEAKS_BITS = int(os.environ.get('PEAKS_BITS') or 8)  # 8 or 16
+    
+    # Scheduling: queued analyses are dispatched shortest job first
+    SCHEDULER_MAX_IN_FLIGHT = int(os.environ.get('SCHEDULER_MAX_IN_FLIGHT') or 4)  # match worker concurrency
+    # Seconds of priority credit per second waited, so long jobs aren't starved
+    SCHEDULER_AGING_RATE = float(os.environ.get('SCHEDULER_AGING_RATE') or 2.0)
+    # Priority penalty, in seconds, per job a client already has in flight
+    SCHEDULER_FAIRNESS_PENALTY = float(os.environ.get('SCHEDULER_FAIRNESS_PENALTY') or 1800)
+    SCHEDULER_UNKNOWN_DURATION = float(os.environ.get('SCHEDULER_UNKNOWN_DURATION') or 3600)
+    
+    # Analyses fetched per round trip, and per Parquet row group, when exporting
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 500)
+    
+    # Metrics configuration
+    # Port for the worker-side Prometheus exporter; the API serves /api/metrics itself
+    WORKER_METRICS_PORT = int(os.environ.get('WORKER_METRICS_PORT') or 0)
+    
+    # Profiling configuration
+    # Fraction of analyses run under the sampling profiler without being asked to
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE') or 0)
+    PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL') or 0.005)  # seconds between samples
+    PROFILE_FORMAT = os.environ.get('PROFILE_FORMAT') or 'speedscope'  # speedscope or pstats
+    PROFILE_FOLDER = os.path.join(UPLOAD_FOLDER, 'profiles')
+    
+    # Admin endpoints are disabled unless a token is configured
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
@@ -0,0 +1,170 @@
+import io
+import json
+from .models import Analysis, Track, db
+
+# Export formats and their content types; pyarrow is only imported for the
+# columnar formats, so the API doesn't load it unless someone asks for them
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+EXTENSIONS = {'ndjson': 'ndjson', 'parquet': 'parquet', 'arrow': 'arrows'}
+
+ANALYSIS_COLUMNS = (
+    Analysis.id, Analysis.url, Analysis.status, Analysis.created_at,
+    Analysis.started_at, Analysis.completed_at, Analysis.duration, Analysis.source_duration,
+    Analysis.source_size, Analysis.error_message,
+)
+TRACK_COLUMNS = (
+    Track.id, Track.title, Track.start_time, Track.end_time, Track.confidence, Track.track_type,
+    Track.bpm, Track.first_beat, Track.key, Track.loudness, Track.spectral_centroid,
+)
+
+def analysis_query(statuses=None, since=None, until=None):
+    query = db.select(*ANALYSIS_COLUMNS)
+    if statuses:
+        query = query.where(Analysis.status.in_(statuses))
+    if since:
+        query = query.where(Analysis.created_at >= since)
+    if until:
+        query = query.where(Analysis.created_at < until)
+    return query.order_by(Analysis.id)
+
+def iter_batches(statuses=None, since=None, until=None, batch_size=500):
+    """Yield lists of (analysis_row, track_rows), `batch_size` analyses at a time.
+
+    Analyses are read through a server-side cursor and each batch's tracks
+    with one indexed query, so memory stays flat however many analyses
+    match, and analysis columns aren't repeated for every track.
+    """
+    connection = db.session.connection()
+    streamed = connection.execution_options(yield_per=batch_size)
+    for analyses in streamed.execute(analysis_query(statuses, since, until)).partitions():
+        tracks = {row[0]: [] for row in analyses}
+        rows = connection.execute(
+            db.select(Track.analysis_id, *TRACK_COLUMNS)
+            .where(Track.analysis_id.in_(list(tracks)))
+            .order_by(Track.analysis_id, Track.start_time)
+        ).all()
+        for row in rows:
+            tracks[row[0]].append(row[1:])
+        yield [(analysis, tracks[analysis[0]]) for analysis in analyses]
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def iter_ndjson(batches):
+    """One JSON object per analysis, with its tracks nested, one per line."""
+    analysis_keys = [column.key for column in ANALYSIS_COLUMNS]
+    track_keys = [column.key for column in TRACK_COLUMNS]
+    for batch in batches:
+        lines = []
+        for analysis, tracks in batch:
+            record = dict(zip(analysis_keys, analysis))
+            for key in ('created_at', 'started_at', 'completed_at'):
+                record[key] = _isoformat(record[key])
+            record['tracks'] = [dict(zip(track_keys, track)) for track in tracks]
+            lines.append(json.dumps(record))
+        yield ('\n'.join(lines) + '\n').encode()
+
+def arrow_schema():
+    import pyarrow as pa
+
+    track_type = pa.struct([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('start_time', pa.float64()),
+        ('end_time', pa.float64()),
+        ('confidence', pa.float64()),
+        ('track_type', pa.string()),
+        ('bpm', pa.float64()),
+        ('first_beat', pa.float64()),
+        ('key', pa.string()),
+        ('loudness', pa.float64()),
+        ('spectral_centroid', pa.float64()),
+    ])
+    return pa.schema([
+        ('id', pa.int64()),
+        ('url', pa.string()),
+        ('status', pa.string()),
+        ('created_at', pa.timestamp('us')),
+        ('started_at', pa.timestamp('us')),
+        ('completed_at', pa.timestamp('us')),
+        ('duration', pa.float64()),
+        ('source_duration', pa.float64()),
+        ('source_size', pa.int64()),
+        ('error_message', pa.string()),
+        ('tracks', pa.list_(track_type)),
+    ])
+
+def to_record_batch(batch, schema):
+    """One row per analysis; each track field is stored as its own column."""
+    import pyarrow as pa
+
+    analysis_columns = list(zip(*(analysis for analysis, _ in batch)))
+    track_rows = [track for _, tracks in batch for track in tracks]
+    track_columns = list(zip(*track_rows)) if track_rows else [()] * len(TRACK_COLUMNS)
+    offsets = [0]
+    for _, tracks in batch:
+        offsets.append(offsets[-1] + len(tracks))
+
+    track_type = schema.field('tracks').type.value_type
+    tracks = pa.StructArray.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(track_columns, track_type)],
+        fields=list(track_type),
+    )
+    arrays = [pa.array(values, type=field.type)
+              for values, field in zip(analysis_columns, schema)]
+    arrays.append(pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), tracks))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_columnar(batches, fmt):
+    """Parquet (a row group per batch) or an Arrow IPC stream, as byte chunks."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    with writer:
+        for batch in batches:
+            writer.write_batch(to_record_batch(batch, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+def export_analyses(fmt, statuses=None, since=None, until=None, batch_size=500):
+    """Stream matching analyses and their tracks in `fmt`, as byte chunks."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    batches = iter_batches(statuses, since, until, batch_size)
+    if fmt == 'ndjson':
+        return iter_ndjson(batches)
+    return iter_columnar(batches, fmt)
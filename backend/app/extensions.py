@@ -1,7 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from celery import Celery
+from .config import Config
 
 db = SQLAlchemy()
 migrate = Migrate()
 celery = Celery('flacjacket', include=['app.tasks'])
+celery.conf.update(
+    # Long tasks acknowledge late; fetch one at a time so a crash only
+    # redelivers the job that was running
+    worker_prefetch_multiplier=1,
+    broker_transport_options={'visibility_timeout': Config.CELERY_VISIBILITY_TIMEOUT},
+    # Probes are quick network calls; a separate worker keeps them from
+    # waiting behind long analyses
+    task_routes={'app.tasks.probe_analysis': {'queue': 'probe'}},
+)
@@ -0,0 +1,144 @@
+import numpy as np
+import librosa
+from .options import FEATURES
+
+# The frame-level series each per-track feature is aggregated from. The
+# onset envelope is always computed, since segmentation needs it.
+FEATURE_SERIES = {
+    'tempo': 'onset',
+    'key': 'chroma',
+    'loudness': 'rms',
+    'centroid': 'centroid',
+}
+
+PITCH_CLASSES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+# Krumhansl-Kessler key profiles, starting from the tonic
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+def extract_frames(y, sr, features=FEATURES, n_fft=2048, hop_length=512, block_frames=2048):
+    """Frame-level series for `features`, from one STFT per block of audio.
+
+    The audio is framed like `librosa.stft(center=True)` and transformed
+    `block_frames` frames at a time, so memory stays bounded on long mixes.
+    Every series is derived from the same magnitude spectrogram:
+
+    - 'onset': onset strength, as `librosa.onset.onset_strength`, except the
+      log-mel floor is 80 dB below each block's peak rather than the file's
+    - 'chroma': 12 x frames chroma, for key estimation
+    - 'rms': RMS level, for loudness
+    - 'centroid': spectral centroid in Hz
+
+    Returns a dict of arrays keyed by series name.
+    """
+    series = {'onset'} | {FEATURE_SERIES[feature] for feature in features}
+    y_padded = np.pad(np.asarray(y, dtype=np.float32), n_fft // 2)
+    n_frames = 1 + (len(y_padded) - n_fft) // hop_length
+
+    mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft)
+    chroma_basis = librosa.filters.chroma(sr=sr, n_fft=n_fft) if 'chroma' in series else None
+    # RMS from a windowed spectrum is low by the window's energy; undo that
+    window_gain = np.sqrt(np.mean(librosa.filters.get_window('hann', n_fft) ** 2))
+    blocks = {name: [] for name in series}
+    previous_mel = None
+
+    for start in range(0, n_frames, block_frames):
+        end = min(start + block_frames, n_frames)
+        S = np.abs(librosa.stft(y_padded[start * hop_length:(end - 1) * hop_length + n_fft],
+                                n_fft=n_fft, hop_length=hop_length, center=False))
+        power = S ** 2
+
+        # Spectral flux between consecutive log-mel frames, across block edges
+        mel = librosa.power_to_db(mel_basis @ power)
+        if previous_mel is not None:
+            mel = np.concatenate([previous_mel, mel], axis=1)
+        blocks['onset'].append(np.maximum(0.0, np.diff(mel, axis=1)).mean(axis=0))
+        previous_mel = mel[:, -1:]
+
+        if 'chroma' in series:
+            blocks['chroma'].append(librosa.util.normalize(chroma_basis @ power, norm=np.inf, axis=0))
+        if 'rms' in series:
+            blocks['rms'].append(librosa.feature.rms(S=S, frame_length=n_fft)[0] / window_gain)
+        if 'centroid' in series:
+            blocks['centroid'].append(librosa.feature.spectral_centroid(S=S, sr=sr, n_fft=n_fft)[0])
+
+    frames = {name: np.concatenate(values, axis=-1) for name, values in blocks.items()}
+
+    # Shift the envelope for the lag and frame centering, as onset_strength does
+    lag_pad = 1 + n_fft // (2 * hop_length)
+    frames['onset'] = np.concatenate([np.zeros(lag_pad, dtype=np.float32), frames['onset']])[:n_frames]
+    return frames
+
+def estimate_key(chroma):
+    """Key name (e.g. 'A minor') best matching the mean of a 12 x frames chroma."""
+    profile = chroma.mean(axis=1)
+    best, best_score = None, -np.inf
+    for mode, template in (('major', MAJOR_PROFILE), ('minor', MINOR_PROFILE)):
+        for tonic in range(12):
+            score = np.corrcoef(profile, np.roll(template, tonic))[0, 1]
+            if score > best_score:
+                best, best_score = f"{PITCH_CLASSES[tonic]} {mode}", score
+    return best
+
+def _grid_score(onset_envelope, period):
+    """Mean onset strength on a beat grid of `period` frames, for every whole-frame phase."""
+    count = int((len(onset_envelope) - 1) // period)
+    if count < 1:
+        return np.zeros(0)
+    positions = np.arange(int(np.ceil(period)))[:, None] + period * np.arange(count)[None, :]
+    return np.interp(positions, np.arange(len(onset_envelope)), onset_envelope).mean(axis=1)
+
+def beat_grid(onset_envelope, bpm, sr, hop_length=512, tolerance=0.03):
+    """Constant-tempo beat grid fitted to an onset envelope.
+
+    Tempos within `tolerance` of `bpm` are tried, first in 0.1 then in 0.01
+    BPM steps, each at every phase; the grid whose beats land on the most onset
+    strength wins. This also refines librosa's tempo estimate, which is only
+    as fine as its autocorrelation lags (e.g. 117.5 or 123 BPM, nothing between).
+
+    Returns the grid's tempo and its beat positions, in (fractional) frames.
+    """
+    if not bpm or not onset_envelope.any():
+        return bpm, np.zeros(0)
+
+    best_score, best_bpm, best_phase = -np.inf, bpm, 0
+    for low, high, step in ((bpm * (1 - tolerance), bpm * (1 + tolerance), 0.1), (None, None, 0.01)):
+        if low is None:
+            low, high = best_bpm - 0.1, best_bpm + 0.1
+        for candidate in np.arange(low, high + step / 2, step):
+            scores = _grid_score(onset_envelope, 60.0 * sr / (hop_length * candidate))
+            if len(scores) and scores.max() > best_score:
+                best_score, best_bpm, best_phase = scores.max(), candidate, int(np.argmax(scores))
+
+    period = 60.0 * sr / (hop_length * best_bpm)
+    return float(best_bpm), np.arange(best_phase, len(onset_envelope), period)
+
+def summarize(frames, start_time, end_time, sr, features=FEATURES, hop_length=512):
+    """Per-track aggregates of the frame-level series between two times.
+
+    Returns the Track columns for `features`: bpm and first_beat (the beat
+    grid's phase, in seconds from the start of the mix), key, loudness (RMS
+    level in dBFS) and spectral_centroid (mean, in Hz).
+    """
+    start, end = librosa.time_to_frames([start_time, end_time], sr=sr, hop_length=hop_length)
+    if end <= start:
+        return {}
+
+    summary = {}
+    if 'tempo' in features:
+        onset = frames['onset'][start:end]
+        bpm, beats = beat_grid(onset, float(librosa.feature.tempo(
+            onset_envelope=onset, sr=sr, hop_length=hop_length)[0]), sr, hop_length)
+        summary['bpm'] = bpm
+        # The grid has a constant tempo, so bpm and its first beat describe all of it
+        summary['first_beat'] = float(librosa.frames_to_time(
+            start + beats[0], sr=sr, hop_length=hop_length)) if len(beats) else None
+    if 'key' in features:
+        chroma = frames['chroma'][:, start:end]
+        summary['key'] = estimate_key(chroma) if chroma.any() else None
+    if 'loudness' in features:
+        level = np.sqrt(np.mean(frames['rms'][start:end] ** 2))
+        summary['loudness'] = float(20 * np.log10(max(level, 1e-10)))
+    if 'centroid' in features:
+        summary['spectral_centroid'] = float(frames['centroid'][start:end].mean())
+    return summary
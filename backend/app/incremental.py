@@ -0,0 +1,89 @@
+import numpy as np
+import librosa
+from .features import extract_frames
+
+class IncrementalSegmenter:
+    """Onset-based segmentation of a recording that arrives in blocks.
+
+    Each block is analysed together with a short tail of the audio before it,
+    so onsets near a block boundary are still detected. Onsets in the last
+    `holdback` seconds are not trusted until more audio arrives, which means
+    every segment returned by `feed` is final. Onset picking is normalised
+    per block rather than over the whole file, so boundaries can differ
+    slightly from a one-shot `analyze_audio` run.
+
+    The segmenter's progress round-trips through `state()` (JSON-safe) and
+    the `tail` array, so it can be checkpointed between blocks.
+    """
+
+    def __init__(self, sr, min_duration=5.0, context=2.0, holdback=1.0, state=None, tail=None):
+        self.sr = sr
+        self.min_duration = min_duration
+        self.context = context
+        self.holdback = holdback
+
+        state = state or {}
+        self.processed_samples = state.get('processed_samples', 0)
+        self.committed_until = state.get('committed_until', 0.0)
+        self.pending_start = state.get('pending_start')
+        self.tail = tail if tail is not None else np.zeros(0, dtype=np.float32)
+
+    @property
+    def duration(self):
+        return self.processed_samples / self.sr
+
+    def state(self):
+        return {
+            'processed_samples': self.processed_samples,
+            'committed_until': self.committed_until,
+            'pending_start': self.pending_start,
+        }
+
+    def feed(self, y):
+        """Analyse the next block of mono audio and return newly certain segments."""
+        return self._process(y, final=False)
+
+    def finish(self):
+        """Close the recording: flush held-back onsets and the final segment."""
+        segments = self._process(np.zeros(0, dtype=np.float32), final=True)
+        remaining = self.duration - (self.pending_start or 0.0)
+
+        if self.pending_start is None:
+            if self.duration > 0:
+                segments.append(self._segment(0.0, self.duration, 'full_track', confidence=0.9))
+        elif remaining >= self.min_duration:
+            segments.append(self._segment(self.pending_start, self.duration, 'final_segment'))
+        return segments
+
+    def _process(self, y, final):
+        buf = np.concatenate([self.tail, np.asarray(y, dtype=np.float32)])
+        buf_start = (self.processed_samples - len(self.tail)) / self.sr
+        self.processed_samples += len(y)
+        final_until = self.duration if final else self.duration - self.holdback
+
+        onset_times = []
+        if len(buf):
+            # Only the onset envelope; per-track features aren't computed for live recordings
+            envelope = extract_frames(buf, self.sr, features=())['onset']
+            onset_frames = librosa.onset.onset_detect(onset_envelope=envelope, sr=self.sr)
+            onset_times = librosa.frames_to_time(onset_frames, sr=self.sr) + buf_start
+        new_onsets = [float(t) for t in onset_times if self.committed_until <= t < final_until]
+        self.committed_until = max(self.committed_until, final_until)
+        self.tail = buf[-int((self.context + self.holdback) * self.sr):]
+
+        segments = []
+        for onset in new_onsets:
+            if self.pending_start is not None and onset - self.pending_start >= self.min_duration:
+                segments.append(self._segment(self.pending_start, onset, 'onset_based'))
+            self.pending_start = onset
+        return segments
+
+    def _segment(self, start_time, end_time, segment_type, confidence=None):
+        if confidence is None:
+            confidence = min(0.9, (end_time - start_time) / 60.0)  # Higher confidence for longer segments
+        return {
+            'start_time': float(start_time),
+            'end_time': float(end_time),
+            'confidence': confidence,
+            'type': segment_type
+        }
@@ -0,0 +1,137 @@
+import os
+import resource
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+# Pipeline stages: probe, download, transcode, load, feature_extraction, onset_detection,
+# segmentation, track_features,
+# boundary_refinement, peaks, db_write
+STAGE_DURATION = Histogram(
+    'flacjacket_stage_duration_seconds',
+    'Time spent in each stage of the analysis pipeline',
+    ['stage'],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+DOWNLOADED_BYTES = Counter(
+    'flacjacket_downloaded_bytes_total',
+    'Bytes of source audio downloaded',
+    ['source'],
+)
+AUDIO_SECONDS = Counter(
+    'flacjacket_audio_seconds_total',
+    'Seconds of audio analysed',
+)
+AUDIO_SECONDS_PER_CPU_SECOND = Histogram(
+    'flacjacket_audio_seconds_per_cpu_second',
+    'Seconds of audio processed per CPU second spent by a task',
+    buckets=(0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+TASK_PEAK_MEMORY = Histogram(
+    'flacjacket_task_peak_memory_bytes',
+    'Peak resident memory of the worker process during a task',
+    buckets=tuple(2 ** n * 1024 * 1024 for n in range(5, 15)),  # 32MB .. 8GB
+)
+QUEUE_WAIT = Histogram(
+    'flacjacket_queue_wait_seconds',
+    'Time between an analysis being submitted and a worker starting it',
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 600, 1800, 3600, 7200, 14400),
+)
+ANALYSES_SUBMITTED = Counter(
+    'flacjacket_analyses_submitted_total',
+    'Analyses submitted through the API',
+)
+ANALYSES_FINISHED = Counter(
+    'flacjacket_analyses_finished_total',
+    'Analyses finished by a worker',
+    ['status'],
+)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as one pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage=name).observe(time.perf_counter() - start)
+
+
+def cpu_seconds():
+    """CPU time used by this process and its reaped children (scdl, ffmpeg)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_memory_bytes():
+    """Peak RSS of this process since the last reset_peak_memory(), or ever.
+
+    Read from VmHWM on Linux; elsewhere ru_maxrss, which can't be reset.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def reset_peak_memory():
+    """Restart peak RSS tracking from the current RSS; False where that isn't supported.
+
+    Prefork workers run many tasks per process, so without a reset the peak
+    would be that of the largest task the process has ever run.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def start_task():
+    """Begin measuring a task; returns the state to pass to observe_task."""
+    return cpu_seconds(), reset_peak_memory()
+
+
+def observe_task(started, audio_duration):
+    """Record per-task resource usage once an analysis has finished."""
+    cpu_start, peak_reset = started
+    cpu = cpu_seconds() - cpu_start
+    if audio_duration and cpu > 0:
+        AUDIO_SECONDS_PER_CPU_SECOND.observe(audio_duration / cpu)
+    # Only a peak measured from the start of this task says anything about it
+    if peak_reset:
+        TASK_PEAK_MEMORY.observe(peak_memory_bytes())
+
+
+def registry():
+    """Registry to export; aggregates all processes when PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        collector_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collector_registry)
+        return collector_registry
+    return REGISTRY
+
+
+def render_latest():
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def start_exporter(port):
+    """Serve metrics over HTTP from a process without a Flask app (the Celery worker)."""
+    start_http_server(port, registry=registry())
@@ -7,12 +7,20 @@ class Analysis(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.String(500), nullable=False)
-    status = db.Column(db.String(50), default='pending')  # pending, processing, completed, failed
+    status = db.Column(db.String(50), default='pending', index=True)  # pending, queued, processing, live, completed, failed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     started_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     duration = db.Column(db.Float)  # Duration in seconds
     error_message = db.Column(db.Text)
+    client_id = db.Column(db.String(100))  # submitter, for fair scheduling
+    source_duration = db.Column(db.Float)  # probed before download, in seconds
+    source_size = db.Column(db.BigInteger)  # probed before download, in bytes
+    dispatched_at = db.Column(db.DateTime)  # when the scheduler sent it to a worker
+    finalize_requested_at = db.Column(db.DateTime)  # when a live recording was marked complete
+    options = db.Column(db.JSON)  # per-request options, e.g. {'profile': true}
+    profile_path = db.Column(db.String(500))  # path to the profiler artifact, if profiled
+    checkpoint = db.Column(db.JSON)  # worker progress, used to continue or resume processing
     
     # Relationship with Track model
     tracks = db.relationship('Track', back_populates='analysis', cascade='all, delete-orphan')
@@ -26,13 +34,19 @@ class Analysis(db.Model):
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'duration': self.duration,
+            'source_duration': self.source_duration,
+            'source_size': self.source_size,
             'error_message': self.error_message,
+            'options': self.options or {},
             'tracks': [track.to_dict() for track in self.tracks]
         }
 
 class Track(db.Model):
     """Track model for storing detected tracks within an analysis."""
     __tablename__ = 'tracks'
+    __table_args__ = (
+        db.Index('ix_tracks_analysis_id_start_time', 'analysis_id', 'start_time'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'), nullable=False)
@@ -40,8 +54,13 @@ class Track(db.Model):
     start_time = db.Column(db.Float, nullable=False)
     end_time = db.Column(db.Float, nullable=False)
     confidence = db.Column(db.Float, nullable=False)
-    track_type = db.Column(db.String(50), nullable=False)  # 'full_track', 'onset_based', or 'final_segment'
+    track_type = db.Column(db.String(50), nullable=False)  # 'full_track', 'onset_based', 'final_segment', 'chapter' or 'tracklist'
     file_path = db.Column(db.String(500))  # path to the extracted audio file
+    bpm = db.Column(db.Float)
+    first_beat = db.Column(db.Float)  # beat grid phase; beats follow every 60 / bpm seconds
+    key = db.Column(db.String(20))  # e.g. 'A minor'
+    loudness = db.Column(db.Float)  # RMS level in dBFS
+    spectral_centroid = db.Column(db.Float)  # mean, in Hz
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationship with Analysis model
@@ -57,5 +76,10 @@ class Track(db.Model):
             'confidence': self.confidence,
             'track_type': self.track_type,
             'file_path': self.file_path,
+            'bpm': self.bpm,
+            'first_beat': self.first_beat,
+            'key': self.key,
+            'loudness': self.loudness,
+            'spectral_centroid': self.spectral_centroid,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
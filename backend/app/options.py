@@ -0,0 +1,50 @@
+# Resamplers librosa can use without optional extras, best quality first
+RES_TYPES = ('soxr_vhq', 'soxr_hq', 'soxr_mq', 'soxr_lq', 'soxr_qq', 'polyphase', 'fft')
+# How to use chapters or a tracklist published with the source
+METADATA_MODES = ('skip', 'refine', 'ignore')
+# Per-track features derived from the shared spectrogram
+FEATURES = ('tempo', 'key', 'loudness', 'centroid')
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
+def validate_options(options):
+    """Return an error message for invalid request options, or None."""
+    if not isinstance(options, dict):
+        return 'options must be an object'
+
+    if 'profile' in options and not isinstance(options['profile'], bool):
+        return 'options.profile must be a boolean'
+
+    if 'sample_rate' in options:
+        sample_rate = options['sample_rate']
+        if isinstance(sample_rate, bool) or not isinstance(sample_rate, int) \
+                or not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+            return f'options.sample_rate must be an integer between {MIN_SAMPLE_RATE} and {MAX_SAMPLE_RATE}'
+
+    if 'res_type' in options and options['res_type'] not in RES_TYPES:
+        return f"options.res_type must be one of {', '.join(RES_TYPES)}"
+
+    if 'mono' in options and not isinstance(options['mono'], bool):
+        return 'options.mono must be a boolean'
+
+    if 'incremental' in options and not isinstance(options['incremental'], bool):
+        return 'options.incremental must be a boolean'
+
+    if 'metadata' in options and options['metadata'] not in METADATA_MODES:
+        return f"options.metadata must be one of {', '.join(METADATA_MODES)}"
+
+    if 'features' in options:
+        features = options['features']
+        if not isinstance(features, list) or any(feature not in FEATURES for feature in features):
+            return f"options.features must be a list of {', '.join(FEATURES)}"
+
+    return None
+
+def analysis_params(options, config):
+    """Decode and analysis parameters for a task, falling back to the app config."""
+    return {
+        'sample_rate': options.get('sample_rate') or config['ANALYSIS_SAMPLE_RATE'],
+        'res_type': options.get('res_type') or config['ANALYSIS_RES_TYPE'],
+        'mono': options.get('mono', config['ANALYSIS_MONO']),
+        'features': tuple(options.get('features', config['ANALYSIS_FEATURES'])),
+    }
@@ -0,0 +1,16 @@
+import json
+import os
+
+# On-disk layout of a peak pyramid, kept free of numpy so the API can serve it
+INDEX_FILE = 'index.json'
+
+def level_path(folder, level):
+    return os.path.join(folder, f"{level}.dat")
+
+def read_index(folder):
+    """The pyramid's index.json, or None if no peaks were stored."""
+    path = os.path.join(folder, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
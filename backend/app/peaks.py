@@ -0,0 +1,129 @@
+import json
+import os
+import numpy as np
+import soundfile as sf
+from .peak_files import INDEX_FILE, level_path
+
+# Bits per stored sample; peaks are interleaved (min, max) pairs
+PEAK_DTYPES = {8: np.int8, 16: np.int16}
+
+class PeakBuilder:
+    """Min/max peaks of audio that arrives in blocks.
+
+    Every `samples_per_peak` samples become one (min, max) pair. A block
+    that ends mid-peak carries the partial min/max over to the next one;
+    that partial peak round-trips through `state()` (JSON-safe) so the
+    builder can be checkpointed between blocks.
+    """
+
+    def __init__(self, samples_per_peak, state=None):
+        self.samples_per_peak = samples_per_peak
+
+        state = state or {}
+        self.length = state.get('length', 0)  # peaks returned so far
+        self.pending = state.get('pending', 0)  # samples in the partial peak
+        self.pending_min = state.get('pending_min', 0.0)
+        self.pending_max = state.get('pending_max', 0.0)
+
+    def state(self):
+        return {
+            'length': self.length,
+            'pending': self.pending,
+            'pending_min': self.pending_min,
+            'pending_max': self.pending_max,
+        }
+
+    def feed(self, y):
+        """Return an (n, 2) array of the peaks completed by the next block of mono audio."""
+        y = np.asarray(y, dtype=np.float32)
+        peaks = []
+
+        # Complete the partial peak left over from the previous block
+        if self.pending and len(y):
+            head = y[:self.samples_per_peak - self.pending]
+            y = y[len(head):]
+            self.pending_min = min(self.pending_min, float(head.min()))
+            self.pending_max = max(self.pending_max, float(head.max()))
+            self.pending += len(head)
+            if self.pending == self.samples_per_peak:
+                peaks.append([[self.pending_min, self.pending_max]])
+                self.pending = 0
+
+        whole = len(y) // self.samples_per_peak * self.samples_per_peak
+        if whole:
+            blocks = y[:whole].reshape(-1, self.samples_per_peak)
+            peaks.append(np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=1))
+
+        rest = y[whole:]
+        if len(rest):
+            self.pending = len(rest)
+            self.pending_min = float(rest.min())
+            self.pending_max = float(rest.max())
+
+        peaks = np.concatenate(peaks) if peaks else np.zeros((0, 2), dtype=np.float32)
+        self.length += len(peaks)
+        return peaks
+
+    def finish(self):
+        """Close the audio: return the last, partial peak if there is one."""
+        if not self.pending:
+            return np.zeros((0, 2), dtype=np.float32)
+        self.pending = 0
+        self.length += 1
+        return np.array([[self.pending_min, self.pending_max]], dtype=np.float32)
+
+def compute_peaks(y, samples_per_peak):
+    """Peaks of a whole recording already in memory."""
+    builder = PeakBuilder(samples_per_peak)
+    return np.concatenate([builder.feed(y), builder.finish()])
+
+def file_peaks(path, samples_per_peak, blocksize=1 << 20):
+    """Peaks of an audio file read block by block, downmixed to mono."""
+    builder = PeakBuilder(samples_per_peak)
+    peaks = [builder.feed(block.mean(axis=1))
+             for block in sf.blocks(path, blocksize=blocksize, dtype='float32', always_2d=True)]
+    return np.concatenate(peaks + [builder.finish()])
+
+def quantize(peaks, bits):
+    scale = np.iinfo(PEAK_DTYPES[bits]).max
+    return np.clip(np.round(peaks * scale), -scale, scale).astype(PEAK_DTYPES[bits])
+
+def downsample(peaks, factor):
+    """Merge every `factor` consecutive (min, max) pairs; exact, as mins of mins."""
+    if not len(peaks):
+        return peaks
+    starts = np.arange(0, len(peaks), factor)
+    return np.stack([np.minimum.reduceat(peaks[:, 0], starts),
+                     np.maximum.reduceat(peaks[:, 1], starts)], axis=1)
+
+def write_peaks(folder, peaks, sample_rate, samples_per_peak, levels=6, factor=4, bits=8, offset=0):
+    """Store the finest level of a peak pyramid and rebuild the coarser levels.
+
+    `peaks` are appended after the first `offset` peaks already stored, so
+    incremental analyses only add the new audio and a re-run block simply
+    overwrites what it wrote before. Level n has samples_per_peak * factor**n
+    samples per peak. Each level is a flat file of interleaved (min, max)
+    pairs of `bits`-bit signed integers, described by index.json.
+    """
+    os.makedirs(folder, exist_ok=True)
+    dtype = PEAK_DTYPES[bits]
+    finest = np.zeros((0, 2), dtype=dtype)
+    if offset and os.path.exists(level_path(folder, 0)):
+        finest = np.fromfile(level_path(folder, 0), dtype=dtype).reshape(-1, 2)[:offset]
+    finest = np.concatenate([finest, quantize(np.asarray(peaks), bits)])
+
+    index = {'sample_rate': sample_rate, 'bits': bits, 'levels': []}
+    level_peaks = finest
+    for level in range(levels):
+        if level:
+            level_peaks = downsample(level_peaks, factor)
+        level_peaks.tofile(level_path(folder, level))
+        index['levels'].append({
+            'level': level,
+            'samples_per_peak': samples_per_peak * factor ** level,
+            'length': len(level_peaks),
+        })
+
+    with open(os.path.join(folder, INDEX_FILE), 'w') as f:
+        json.dump(index, f)
+    return index
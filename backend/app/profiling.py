@@ -0,0 +1,44 @@
+import os
+import random
+from contextlib import contextmanager
+from pyinstrument import Profiler
+from pyinstrument.renderers import PstatsRenderer, SpeedscopeRenderer
+
+# Artifact formats: speedscope JSON opens as a flamegraph at speedscope.app,
+# pstats loads with the standard library's pstats module or snakeviz.
+PROFILE_FORMATS = {
+    'speedscope': (SpeedscopeRenderer, '.speedscope.json'),
+    'pstats': (PstatsRenderer, '.pstats'),
+}
+
+def should_profile(options, sample_rate):
+    """Profile when the request asked for it, otherwise for a random sample of tasks."""
+    return bool(options.get('profile')) or random.random() < sample_rate
+
+def artifact_path(folder, analysis_id, profile_format):
+    if profile_format not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown profile format: {profile_format}")
+    _, extension = PROFILE_FORMATS[profile_format]
+    return os.path.join(folder, f"analysis_{analysis_id}{extension}")
+
+@contextmanager
+def profiled(path, profile_format, interval):
+    """Run the enclosed block under the sampling profiler and write the artifact to path.
+
+    Does nothing when path is None, so callers can wrap unprofiled runs too.
+    """
+    if path is None:
+        yield
+        return
+
+    profiler = Profiler(interval=interval)
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        renderer, _ = PROFILE_FORMATS[profile_format]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # PstatsRenderer returns marshalled bytes smuggled through a str
+        with open(path, 'w', encoding='utf-8', errors='surrogateescape') as f:
+            f.write(profiler.output(renderer()))
@@ -0,0 +1,35 @@
+from collections import Counter
+
+def priority(analysis, now, client_in_flight, aging_rate, fairness_penalty, unknown_duration):
+    """Dispatch priority of a queued analysis; lower runs first.
+
+    Shortest job first by source duration, minus `aging_rate` seconds of credit
+    for every second already spent waiting so long jobs can't starve, plus
+    `fairness_penalty` for every job the same client already has in flight.
+    """
+    duration = analysis.source_duration if analysis.source_duration is not None else unknown_duration
+    waited = (now - analysis.created_at).total_seconds()
+    return duration - aging_rate * waited + fairness_penalty * client_in_flight
+
+def pick_next(candidates, in_flight_by_client, now, slots,
+              aging_rate, fairness_penalty, unknown_duration):
+    """Choose up to `slots` queued analyses to dispatch, in dispatch order.
+
+    Picks one at a time so each pick counts against its client's share for
+    the picks that follow.
+    """
+    in_flight = Counter(in_flight_by_client)
+    remaining = list(candidates)
+    chosen = []
+
+    while remaining and len(chosen) < slots:
+        best = min(remaining, key=lambda analysis: (
+            priority(analysis, now, in_flight[analysis.client_id],
+                     aging_rate, fairness_penalty, unknown_duration),
+            analysis.created_at,
+            analysis.id,
+        ))
+        remaining.remove(best)
+        chosen.append(best)
+        in_flight[best.client_id] += 1
+    return chosen
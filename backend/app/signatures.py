@@ -0,0 +1,7 @@
+from .extensions import celery
+
+# The API enqueues tasks by name through these signatures instead of importing
+# app.tasks, which would load librosa, numpy and yt-dlp into every gunicorn
+# worker. Only the Celery worker imports the task implementations.
+process_audio_increment = celery.signature('app.tasks.process_audio_increment')
+probe_analysis = celery.signature('app.tasks.probe_analysis')
@@ -1,38 +1,88 @@
+import json
 import os
+import shutil
 import tempfile
+import time
 from datetime import datetime
 import yt_dlp
 import librosa
 import numpy as np
+import soundfile as sf
 from urllib.parse import urlparse
 import subprocess
 import structlog
+from celery.signals import worker_init
 from celery.utils.log import get_task_logger
+from . import metrics, profiling, scheduling, tracklist
+from .features import extract_frames, summarize
+from .incremental import IncrementalSegmenter
+from .peaks import PeakBuilder, compute_peaks, file_peaks, write_peaks
+from .options import analysis_params
+from .config import Config
 from .extensions import celery, db
 from .models import Analysis, Track
 
 # Set up structured logging
 logger = structlog.wrap_logger(get_task_logger(__name__))
 
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Expose worker-side metrics when WORKER_METRICS_PORT is configured."""
+    if Config.WORKER_METRICS_PORT:
+        metrics.start_exporter(Config.WORKER_METRICS_PORT)
+        logger.info('metrics_exporter_started', port=Config.WORKER_METRICS_PORT)
+
 def is_soundcloud_url(url):
     parsed = urlparse(url)
     return 'soundcloud.com' in parsed.netloc
 
-def download_audio(url, output_path):
-    log = logger.bind(url=url, output_path=output_path)
+def download_audio(url, output_path, sample_rate=None, mono=False, start=None):
+    """Download url to output_path + '.wav'.
+
+    The WAV is decoded straight to sample_rate (and downmixed when mono is set)
+    so analysis can load it without resampling. sample_rate=None keeps the
+    source rate. With `start` (seconds), only the audio after it is fetched
+    and decoded, by seeking in the source media with ffmpeg.
+    """
+    log = logger.bind(url=url, output_path=output_path, sample_rate=sample_rate, mono=mono, start=start)
     log.info('starting_audio_download')
     
-    if is_soundcloud_url(url):
+    ffmpeg_args = []
+    if sample_rate:
+        ffmpeg_args += ['-ar', str(sample_rate)]
+    if mono:
+        ffmpeg_args += ['-ac', '1']
+    
+    if start:
+        # The media URL behind the page, so ffmpeg can request from the seek point on
+        media_url = probe_source(url).get('url') or url
+        with metrics.stage('download'):
+            result = subprocess.run([
+                'ffmpeg',
+                '-ss', f"{start:.6f}",
+                '-i', media_url,
+                '-vn',
+                '-acodec', 'pcm_s16le',
+                *ffmpeg_args,
+                output_path + '.wav'
+            ], capture_output=True, text=True)
+        if result.returncode != 0 or not os.path.exists(output_path + '.wav'):
+            log.error('partial_download_failed', stderr=result.stderr)
+            raise Exception(f"Failed to download audio after {start:.1f}s")
+        metrics.DOWNLOADED_BYTES.labels(source='partial').inc(os.path.getsize(output_path + '.wav'))
+        log.info('partial_download_complete')
+    elif is_soundcloud_url(url):
         log.info('using_soundcloud_downloader')
         try:
             # Download track with scdl
             log.info('downloading_track')
-            result = subprocess.run([
-                'scdl',
-                '-l', url,
-                '--path', os.path.dirname(output_path),
-                '--onlymp3'
-            ], capture_output=True, text=True)
+            with metrics.stage('download'):
+                result = subprocess.run([
+                    'scdl',
+                    '-l', url,
+                    '--path', os.path.dirname(output_path),
+                    '--onlymp3'
+                ], capture_output=True, text=True)
             
             log.info('scdl_output', 
                     stdout=result.stdout,
@@ -49,6 +99,7 @@ def download_audio(url, output_path):
             # Use the first MP3 file found
             mp3_path = os.path.join(os.path.dirname(output_path), mp3_files[0])
             mp3_size = os.path.getsize(mp3_path)
+            metrics.DOWNLOADED_BYTES.labels(source='soundcloud').inc(mp3_size)
             log.info('soundcloud_download_complete', 
                     file_path=mp3_path,
                     file_size_bytes=mp3_size)
@@ -56,13 +107,14 @@ def download_audio(url, output_path):
             # Convert downloaded MP3 to WAV using ffmpeg
             wav_path = output_path + '.wav'
             log.info('converting_to_wav')
-            result = subprocess.run([
-                'ffmpeg',
-                '-i', mp3_path,
-                '-acodec', 'pcm_s16le',
-                '-ar', '44100',
-                wav_path
-            ], capture_output=True, text=True)
+            with metrics.stage('transcode'):
+                result = subprocess.run([
+                    'ffmpeg',
+                    '-i', mp3_path,
+                    '-acodec', 'pcm_s16le',
+                    *ffmpeg_args,
+                    wav_path
+                ], capture_output=True, text=True)
             
             if not os.path.exists(wav_path):
                 log.error('wav_file_not_found', 
@@ -93,6 +145,16 @@ def download_audio(url, output_path):
             raise
     else:
         log.info('using_youtube_downloader')
+        # yt-dlp downloads and then transcodes in one call; the progress hook
+        # marks where the download ends so the two stages can be timed apart.
+        download_started = time.perf_counter()
+        download_finished = {}
+
+        def on_progress(d):
+            if d['status'] == 'finished':
+                download_finished['at'] = time.perf_counter()
+                download_finished['bytes'] = d.get('total_bytes') or d.get('downloaded_bytes') or 0
+
         # Use yt-dlp for other URLs (YouTube, etc.)
         ydl_opts = {
             'format': 'bestaudio/best',
@@ -101,41 +163,124 @@ def download_audio(url, output_path):
                 'key': 'FFmpegExtractAudio',
                 'preferredcodec': 'wav',
             }],
+            'postprocessor_args': {'extractaudio': ffmpeg_args},
             'logger': logger.bind(context='yt-dlp'),
+            'progress_hooks': [on_progress],
         }
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             try:
                 ydl.download([url])
+                finished = time.perf_counter()
+                transcode_started = download_finished.get('at', finished)
+                metrics.STAGE_DURATION.labels(stage='download').observe(transcode_started - download_started)
+                metrics.STAGE_DURATION.labels(stage='transcode').observe(finished - transcode_started)
+                metrics.DOWNLOADED_BYTES.labels(source='youtube').inc(download_finished.get('bytes', 0))
                 log.info('youtube_download_complete')
             except Exception as e:
                 log.error('youtube_download_failed', error=str(e))
                 raise Exception(f"Failed to download from YouTube: {str(e)}")
 
-def analyze_audio(file_path):
+def ffprobe_source(url):
+    """Read duration and size of a media file or direct media URL with ffprobe."""
+    result = subprocess.run([
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'format=duration,size',
+        '-of', 'json',
+        url
+    ], capture_output=True, text=True, timeout=60)
+    fmt = json.loads(result.stdout or '{}').get('format', {})
+    return {
+        'duration': float(fmt['duration']) if 'duration' in fmt else None,
+        'filesize': int(fmt['size']) if 'size' in fmt else None,
+    }
+
+def probe_source(url):
+    """Fetch the source's metadata without downloading its audio.
+
+    Returns the yt-dlp info dict, falling back to ffprobe for URLs yt-dlp
+    can't describe (e.g. direct links to uploaded files).
+    """
+    log = logger.bind(url=url)
+    info = {}
+    with metrics.stage('probe'):
+        try:
+            ydl_opts = {
+                'format': 'bestaudio/best',
+                'skip_download': True,
+                'logger': logger.bind(context='yt-dlp'),
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False) or {}
+        except Exception as e:
+            log.warning('yt_dlp_probe_failed', error=str(e))
+        
+        if info.get('duration') is None:
+            probed = ffprobe_source(url)
+            info = {**info, **{key: value for key, value in probed.items() if value is not None}}
+    return info
+
+def store_peaks(config, analysis_id, peaks, sample_rate, offset=0):
+    """Write an analysis' waveform peak pyramid under PEAKS_FOLDER."""
+    with metrics.stage('peaks'):
+        return write_peaks(os.path.join(config['PEAKS_FOLDER'], str(analysis_id)),
+                           peaks, sample_rate, config['PEAKS_SAMPLES_PER_PEAK'],
+                           levels=config['PEAKS_LEVELS'], factor=config['PEAKS_FACTOR'],
+                           bits=config['PEAKS_BITS'], offset=offset)
+
+def detect_onsets(file_path, sample_rate=22050, res_type='soxr_hq', on_load=None, features=()):
+    """Load file_path as mono at sample_rate and return (onset_times, duration, frames).
+
+    Files already decoded at sample_rate (see download_audio) are not
+    resampled; res_type is only used when the rates differ. on_load, if
+    given, is called with (y, sr) so other results can be derived from the
+    same decoded audio. Onsets are picked from the envelope in `frames`,
+    the frame-level series computed from one shared STFT for `features`
+    (see features.extract_frames).
+    """
     log = logger.bind(file_path=file_path)
     log.info('starting_audio_analysis')
     
     try:
         # Load the audio file
         log.info('loading_audio_file')
-        y, sr = librosa.load(file_path)
+        with metrics.stage('load'):
+            y, sr = librosa.load(file_path, sr=sample_rate, mono=True, res_type=res_type)
         duration = librosa.get_duration(y=y, sr=sr)
+        metrics.AUDIO_SECONDS.inc(duration)
         log.info('audio_file_loaded', 
                 duration_seconds=duration,
                 sample_rate=sr,
                 total_samples=len(y))
+        if on_load:
+            on_load(y, sr)
+        
+        log.info('extracting_features', features=list(features))
+        with metrics.stage('feature_extraction'):
+            frames = extract_frames(y, sr, features)
         
         # Perform onset detection
         log.info('performing_onset_detection')
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
-        onset_times = librosa.frames_to_time(onset_frames, sr=sr)
+        with metrics.stage('onset_detection'):
+            onset_frames = librosa.onset.onset_detect(onset_envelope=frames['onset'], sr=sr)
+            onset_times = librosa.frames_to_time(onset_frames, sr=sr)
         log.info('onset_detection_complete', 
                 total_onsets=len(onset_times),
                 first_onset=float(onset_times[0]) if len(onset_times) > 0 else None,
                 last_onset=float(onset_times[-1]) if len(onset_times) > 0 else None)
-        
+        return onset_times, duration, frames
+    except Exception as e:
+        log.error('analysis_failed', error=str(e))
+        raise
+
+def segment_onsets(onset_times, duration):
+    """Turn detected onsets into track segments."""
+    log = logger.bind(total_duration=duration)
+    
+    try:
         # Use onset times to segment the audio
         log.info('segmenting_audio')
+        segmentation_started = time.perf_counter()
         segments = []
         min_duration = 5  # Minimum segment duration in seconds
         
@@ -189,6 +334,7 @@ def analyze_audio(file_path):
                             end_time=float(duration),
                             duration=remaining_duration,
                             confidence=confidence)
+        metrics.STAGE_DURATION.labels(stage='segmentation').observe(time.perf_counter() - segmentation_started)
         
         log.info('analysis_complete', 
                 total_segments=len(segments),
@@ -200,12 +346,63 @@ def analyze_audio(file_path):
         log.error('analysis_failed', error=str(e))
         raise
 
-def process_segments(analysis_id, segments, file_path):
-    """Process detected segments and create Track entries."""
+def analyze_audio(file_path, sample_rate=22050, res_type='soxr_hq'):
+    """Detect segments in file_path; returns (segments, duration)."""
+    onset_times, duration, _ = detect_onsets(file_path, sample_rate=sample_rate, res_type=res_type)
+    return segment_onsets(onset_times, duration), duration
+
+# Onset envelope frames at each end of a refine window affected by padding:
+# the lag and centering shift, then the frames whose FFT window overlaps the
+# zero padding (for the default n_fft=2048, hop_length=512)
+REFINE_EDGE_FRAMES = 1 + 2048 // 512
+
+def refine_boundaries(tracks, file_path, sample_rate=22050, res_type='soxr_hq', window=10.0,
+                      min_peak_ratio=3.0):
+    """Snap the boundaries between consecutive tracks to nearby onsets.
+
+    Each boundary claimed by the source metadata moves to the strongest onset
+    within `window` seconds of it, if that onset is at least `min_peak_ratio`
+    times the window's median onset strength; over silence or steady noise the
+    claimed boundary is kept. Only those windows are decoded, not the whole
+    mix. Tracks must be ordered by start time; they are updated in place.
+    """
+    log = logger.bind(file_path=file_path, window=window)
+    log.info('refining_boundaries', total_boundaries=max(len(tracks) - 1, 0))
+    
+    for previous, track in zip(tracks, tracks[1:]):
+        claimed = track.start_time
+        offset = max(previous.start_time, claimed - window)
+        y, sr = librosa.load(file_path, sr=sample_rate, mono=True, res_type=res_type,
+                             offset=offset, duration=min(claimed + window, track.end_time) - offset)
+        if not len(y):
+            continue
+        
+        # The outermost frames see the zero padding around the window, which
+        # reads as an onset wherever the window starts in sound
+        envelope = librosa.onset.onset_strength(y=y, sr=sr)[REFINE_EDGE_FRAMES:-REFINE_EDGE_FRAMES]
+        if not len(envelope):
+            continue
+        peak = int(np.argmax(envelope))
+        if envelope[peak] <= min_peak_ratio * np.median(envelope):
+            log.info('boundary_kept', title=track.title, claimed=claimed)
+            continue
+        
+        boundary = offset + float(librosa.frames_to_time(peak + REFINE_EDGE_FRAMES, sr=sr))
+        previous.end_time = boundary
+        track.start_time = boundary
+        log.info('boundary_refined', title=track.title, claimed=claimed, refined=boundary)
+    return tracks
+
+def process_segments(analysis_id, segments, file_path, start_index=0):
+    """Process detected segments and create Track entries.
+
+    start_index offsets the track numbering when segments are appended to an
+    analysis that already has tracks.
+    """
     log = logger.bind(analysis_id=analysis_id)
     log.info('creating_track_entries')
 
-    for i, segment in enumerate(segments):
+    for i, segment in enumerate(segments, start=start_index):
         track = Track(
             analysis_id=analysis_id,
             title=f"Track {i+1}",
@@ -213,7 +410,12 @@ def process_segments(analysis_id, segments, file_path):
             end_time=segment['end_time'],
             confidence=segment['confidence'],
             track_type=segment['type'],
-            file_path=file_path
+            file_path=file_path,
+            bpm=segment.get('bpm'),
+            first_beat=segment.get('first_beat'),
+            key=segment.get('key'),
+            loudness=segment.get('loudness'),
+            spectral_centroid=segment.get('spectral_centroid')
         )
         db.session.add(track)
     
@@ -225,9 +427,68 @@ def process_segments(analysis_id, segments, file_path):
         db.session.rollback()
         raise
 
+# Postgres advisory lock held by dispatch_queued_analyses until it commits
+DISPATCH_LOCK_KEY = 0x666c6163
+
+def dispatch_queued_analyses(config):
+    """Send queued analyses to the processing workers while slots are free.
+
+    Must run inside an app context. Called whenever a slot may have freed up
+    or a job became ready: after each probe and after each finished analysis.
+    """
+    # Probe and processing workers dispatch concurrently; without a lock each
+    # could count the same free slots. SQLite already serialises writers.
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(db.text('SELECT pg_advisory_xact_lock(:key)'), {'key': DISPATCH_LOCK_KEY})
+    
+    in_flight = dict(
+        db.session.query(Analysis.client_id, db.func.count(Analysis.id))
+        .filter(Analysis.dispatched_at.isnot(None),
+                Analysis.status.in_(('queued', 'processing')))
+        .group_by(Analysis.client_id)
+        .all()
+    )
+    slots = config['SCHEDULER_MAX_IN_FLIGHT'] - sum(in_flight.values())
+    if slots <= 0:
+        db.session.commit()
+        return []
+    
+    candidates = (Analysis.query
+                  .filter(Analysis.status == 'queued', Analysis.dispatched_at.is_(None))
+                  .with_for_update(skip_locked=True)
+                  .all())
+    now = datetime.utcnow()
+    chosen = scheduling.pick_next(
+        candidates, in_flight, now, slots,
+        aging_rate=config['SCHEDULER_AGING_RATE'],
+        fairness_penalty=config['SCHEDULER_FAIRNESS_PENALTY'],
+        unknown_duration=config['SCHEDULER_UNKNOWN_DURATION'],
+    )
+    for analysis in chosen:
+        analysis.dispatched_at = now
+    db.session.commit()
+    
+    sent = []
+    for analysis in chosen:
+        try:
+            process_audio_url.delay(analysis.id)
+        except Exception as e:
+            # Give the slot back, or it stays taken by a job no worker will run
+            logger.error('dispatch_failed', analysis_id=analysis.id, error=str(e))
+            analysis.dispatched_at = None
+            db.session.commit()
+            continue
+        sent.append(analysis)
+        logger.info('analysis_dispatched',
+                    analysis_id=analysis.id,
+                    client_id=analysis.client_id,
+                    source_duration=analysis.source_duration,
+                    waited_seconds=(now - analysis.created_at).total_seconds())
+    return sent
+
 @celery.task(bind=True)
-def process_audio_url(self, analysis_id):
-    """Process a SoundCloud URL and extract tracks."""
+def probe_analysis(self, analysis_id):
+    """Record the source's duration and size, then queue the analysis for dispatch."""
     from app import create_app
     app = create_app()
     
@@ -236,51 +497,409 @@ def process_audio_url(self, analysis_id):
             analysis_id=analysis_id,
             task_id=self.request.id,
         )
-        log.info('starting_audio_processing')
         
         analysis = Analysis.query.get(analysis_id)
         if not analysis:
             log.error('analysis_not_found')
             return
+        if analysis.status != 'pending':
+            log.info('probe_skipped', status=analysis.status)
+            return
         
-        analysis.status = 'processing'
-        analysis.started_at = datetime.utcnow()
-        db.session.commit()
-        log.info('analysis_status_updated', status='processing', started_at=analysis.started_at)
+        probe_started = datetime.utcnow()
+        checkpoint = dict(analysis.checkpoint or {})
         
+        # An unprobed job is still scheduled, just with an assumed duration
+        info = {}
         try:
-            # Create temporary directory for processing
-            with tempfile.TemporaryDirectory() as temp_dir:
-                log.info('created_temp_directory', path=temp_dir)
-                
-                # Download the audio
-                output_path = os.path.join(temp_dir, 'audio')
-                log.info('downloading_audio')
-                download_audio(analysis.url, output_path)
-                
-                # Update task state
-                self.update_state(state='ANALYZING')
-                
-                # Analyze the audio file
-                log.info('analyzing_audio')
-                segments = analyze_audio(output_path + '.wav')
-                
-                # Process segments
-                process_segments(analysis_id, segments, output_path + '.wav')
-                
+            info = probe_source(analysis.url)
+            analysis.source_duration = info.get('duration')
+            analysis.source_size = info.get('filesize') or info.get('filesize_approx')
+            log.info('source_probed',
+                    source_duration=analysis.source_duration,
+                    source_size=analysis.source_size)
+        except Exception as e:
+            log.warning('probe_failed', error=str(e))
+        
+        # Chapters or a timestamped tracklist in the description give us the
+        # tracks, with real titles, before any audio is downloaded
+        mode = (analysis.options or {}).get('metadata') or app.config['METADATA_SEGMENTATION']
+        entries = []
+        if mode != 'ignore' and not checkpoint.get('metadata_tracklist'):
+            entries, track_type, confidence = tracklist.metadata_tracklist(info)
+        if entries:
+            for entry in entries:
+                db.session.add(Track(
+                    analysis_id=analysis_id,
+                    title=entry['title'],
+                    start_time=entry['start_time'],
+                    end_time=entry['end_time'],
+                    confidence=confidence,
+                    track_type=track_type
+                ))
+            log.info('metadata_tracklist_found', total_tracks=len(entries), track_type=track_type, mode=mode)
+            
+            if mode == 'skip':
                 analysis.status = 'completed'
+                analysis.started_at = probe_started
                 analysis.completed_at = datetime.utcnow()
                 analysis.duration = (analysis.completed_at - analysis.started_at).total_seconds()
+                db.session.commit()
+                metrics.ANALYSES_FINISHED.labels(status=analysis.status).inc()
                 log.info('processing_completed',
-                        total_tracks=len(segments),
+                        total_tracks=len(entries),
                         processing_duration=analysis.duration)
+                return
+            analysis.checkpoint = {**checkpoint, 'metadata_tracklist': True}
+        
+        analysis.status = 'queued'
+        db.session.commit()
+        dispatch_queued_analyses(app.config)
+
+@celery.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def process_audio_url(self, analysis_id):
+    """Process a SoundCloud URL and extract tracks.
+
+    Progress is checkpointed on the analysis after each stage (downloaded
+    source, detected onsets, stored tracks). Analyses whose tracks the probe
+    already took from the source metadata only refine those boundaries. The
+    task is only acknowledged once it returns, so a job interrupted by a
+    worker crash or redeploy is redelivered and resumes from its last
+    checkpoint.
+    """
+    from app import create_app
+    app = create_app()
+    
+    with app.app_context():
+        log = logger.bind(
+            analysis_id=analysis_id,
+            task_id=self.request.id,
+        )
+        log.info('starting_audio_processing')
+        
+        analysis = Analysis.query.get(analysis_id)
+        if not analysis:
+            log.error('analysis_not_found')
+            return
+        
+        try:
+            # A message redelivered after the job finished (e.g. the worker died
+            # before acknowledging it) must not run it again
+            if analysis.status not in ('pending', 'queued', 'processing'):
+                log.info('analysis_already_finished', status=analysis.status)
+                return
+            params = analysis_params(analysis.options or {}, app.config)
+            checkpoint = dict(analysis.checkpoint or {})
+            work_dir = os.path.join(app.config['WORK_FOLDER'], str(analysis_id))
+            
+            def save_checkpoint(**values):
+                checkpoint.update(values)
+                analysis.checkpoint = dict(checkpoint)
+                db.session.commit()
+            
+            # A job that keeps killing its worker (e.g. OOM) must not be redelivered forever
+            attempts = checkpoint.get('attempts', 0) + 1
+            if attempts > app.config['TASK_MAX_ATTEMPTS']:
+                log.error('too_many_attempts', attempts=attempts)
+                analysis.status = 'failed'
+                analysis.error_message = f"Processing was interrupted {attempts - 1} times"
+                analysis.completed_at = datetime.utcnow()
+                if analysis.started_at:
+                    analysis.duration = (analysis.completed_at - analysis.started_at).total_seconds()
+                db.session.commit()
+                metrics.ANALYSES_FINISHED.labels(status=analysis.status).inc()
+                return
+            if attempts > 1:
+                log.info('resuming_from_checkpoint', attempt=attempts, checkpoint=checkpoint)
+            
+            profile_format = app.config['PROFILE_FORMAT']
+            if profiling.should_profile(analysis.options or {}, app.config['PROFILE_SAMPLE_RATE']):
+                analysis.profile_path = profiling.artifact_path(
+                    app.config['PROFILE_FOLDER'], analysis_id, profile_format)
+                log.info('profiling_enabled', profile_path=analysis.profile_path)
+            
+            analysis.status = 'processing'
+            if not analysis.started_at:
+                analysis.started_at = datetime.utcnow()
+                metrics.QUEUE_WAIT.observe((analysis.started_at - analysis.created_at).total_seconds())
+            save_checkpoint(attempts=attempts)
+            log.info('analysis_status_updated', status='processing', started_at=analysis.started_at)
+            task_usage = metrics.start_task()
+            audio_duration = None
+            
+            try:
+                with profiling.profiled(analysis.profile_path, profile_format,
+                                        app.config['PROFILE_INTERVAL']):
+                    source_path = checkpoint.get('source_path')
+                    if source_path and os.path.exists(source_path):
+                        log.info('reusing_downloaded_audio', path=source_path)
+                    else:
+                        # Download into a scratch directory, then keep the WAV in the
+                        # work directory so a resumed task doesn't download it again
+                        os.makedirs(work_dir, exist_ok=True)
+                        with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+                            log.info('created_temp_directory', path=temp_dir)
+                            
+                            output_path = os.path.join(temp_dir, 'audio')
+                            log.info('downloading_audio')
+                            download_audio(analysis.url, output_path,
+                                           sample_rate=params['sample_rate'], mono=params['mono'])
+                            source_path = os.path.join(work_dir, 'source.wav')
+                            os.replace(output_path + '.wav', source_path)
+                        save_checkpoint(source_path=source_path)
+                    
+                    # Update task state
+                    self.update_state(state='ANALYZING')
+                    
+                    def on_load(y, sr):
+                        peaks = compute_peaks(y, app.config['PEAKS_SAMPLES_PER_PEAK'])
+                        store_peaks(app.config, analysis_id, peaks, sr)
+                    
+                    if checkpoint.get('metadata_tracklist'):
+                        # The probe already created tracks from the source metadata;
+                        # only the audio around their boundaries is analysed
+                        segments = (Track.query.filter_by(analysis_id=analysis_id)
+                                    .order_by(Track.start_time).all())
+                        frames = None
+                        if checkpoint.get('tracks_written'):
+                            log.info('tracks_already_written')
+                        else:
+                            with metrics.stage('boundary_refinement'):
+                                refine_boundaries(segments, source_path,
+                                                  sample_rate=params['sample_rate'],
+                                                  res_type=params['res_type'],
+                                                  window=app.config['METADATA_REFINE_WINDOW'])
+                            if params['features']:
+                                # Per-track features need the whole mix decoded
+                                _, audio_duration, frames = detect_onsets(
+                                    source_path,
+                                    sample_rate=params['sample_rate'],
+                                    res_type=params['res_type'],
+                                    on_load=on_load,
+                                    features=params['features'])
+                                with metrics.stage('track_features'):
+                                    for track in segments:
+                                        for column, value in summarize(
+                                                frames, track.start_time, track.end_time,
+                                                params['sample_rate'], params['features']).items():
+                                            setattr(track, column, value)
+                            for track in segments:
+                                track.file_path = source_path
+                            save_checkpoint(tracks_written=True)
+                        if frames is None:
+                            # Nothing decoded the whole mix, so stream it for the waveform
+                            store_peaks(app.config, analysis_id,
+                                        file_peaks(source_path, app.config['PEAKS_SAMPLES_PER_PEAK']),
+                                        params['sample_rate'])
+                    else:
+                        onsets_path = checkpoint.get('onsets_path')
+                        features_path = checkpoint.get('features_path')
+                        if onsets_path and os.path.exists(onsets_path):
+                            log.info('reusing_detected_onsets', path=onsets_path)
+                            onset_times = np.load(onsets_path)
+                            audio_duration = checkpoint['audio_duration']
+                            frames = None
+                            if features_path and os.path.exists(features_path):
+                                with np.load(features_path) as stored:
+                                    frames = dict(stored)
+                        else:
+                            log.info('analyzing_audio')
+                            onset_times, audio_duration, frames = detect_onsets(
+                                source_path,
+                                sample_rate=params['sample_rate'],
+                                res_type=params['res_type'],
+                                on_load=on_load,
+                                features=params['features'])
+                            onsets_path = os.path.join(work_dir, 'onsets.npy')
+                            np.save(onsets_path, onset_times)
+                            features_path = os.path.join(work_dir, 'features.npz')
+                            np.savez(features_path, **frames)
+                            save_checkpoint(onsets_path=onsets_path, audio_duration=audio_duration,
+                                            features_path=features_path)
+                        segments = segment_onsets(onset_times, audio_duration)
+                        
+                        if frames is not None:
+                            with metrics.stage('track_features'):
+                                for segment in segments:
+                                    segment.update(summarize(
+                                        frames, segment['start_time'], segment['end_time'],
+                                        params['sample_rate'], params['features']))
+                        
+                        # Tracks and the checkpoint marker are committed together
+                        if checkpoint.get('tracks_written'):
+                            log.info('tracks_already_written')
+                        else:
+                            analysis.checkpoint = {**checkpoint, 'tracks_written': True}
+                            with metrics.stage('db_write'):
+                                process_segments(analysis_id, segments, source_path)
+                    
+                    analysis.status = 'completed'
+                    analysis.completed_at = datetime.utcnow()
+                    analysis.duration = (analysis.completed_at - analysis.started_at).total_seconds()
+                    analysis.checkpoint = None
+                    log.info('processing_completed',
+                            total_tracks=len(segments),
+                            processing_duration=analysis.duration)
+                
+                shutil.rmtree(work_dir, ignore_errors=True)
+                    
+            except Exception as e:
+                log.error('processing_failed', error=str(e))
+                analysis.status = 'failed'
+                analysis.error_message = str(e)
+                analysis.completed_at = datetime.utcnow()
+                analysis.duration = (analysis.completed_at - analysis.started_at).total_seconds()
                 
+            finally:
+                db.session.commit()
+                metrics.ANALYSES_FINISHED.labels(status=analysis.status).inc()
+                metrics.observe_task(task_usage, audio_duration)
+
+        finally:
+            # This job's slot is free, however it ended; hand it to the next queued analysis
+            if analysis.dispatched_at:
+                dispatch_queued_analyses(app.config)
+
+@celery.task(bind=True)
+def process_audio_increment(self, analysis_id):
+    """Analyse the audio appended to a live or growing recording since the last run.
+
+    The recording is re-fetched into the analysis' work directory and only the
+    samples past the checkpoint are analysed. Segments that became certain are
+    stored as tracks together with the new checkpoint, then the task schedules
+    itself again until the analysis is finalized or the source stops growing.
+    """
+    from app import create_app
+    app = create_app()
+    
+    with app.app_context():
+        log = logger.bind(
+            analysis_id=analysis_id,
+            task_id=self.request.id,
+        )
+        log.info('starting_incremental_processing')
+        
+        analysis = Analysis.query.get(analysis_id)
+        if not analysis:
+            log.error('analysis_not_found')
+            return
+        if analysis.status not in ('pending', 'live'):
+            log.info('incremental_processing_stopped', status=analysis.status)
+            return
+        
+        if analysis.status == 'pending':
+            # Downloading a live stream blocks until it ends; only growing
+            # recordings (e.g. a file still being uploaded) can be followed
+            if probe_source(analysis.url).get('is_live'):
+                log.error('live_stream_not_supported')
+                analysis.status = 'failed'
+                analysis.error_message = ('Live streams are not supported yet; submit the recording '
+                                          'once the stream has ended')
+                analysis.completed_at = datetime.utcnow()
+                db.session.commit()
+                metrics.ANALYSES_FINISHED.labels(status=analysis.status).inc()
+                return
+            analysis.status = 'live'
+            analysis.started_at = datetime.utcnow()
+            db.session.commit()
+            log.info('analysis_status_updated', status='live', started_at=analysis.started_at)
+        
+        params = analysis_params(analysis.options or {}, app.config)
+        checkpoint = dict(analysis.checkpoint or {})
+        final = analysis.finalize_requested_at is not None
+        work_dir = os.path.join(app.config['WORK_FOLDER'], str(analysis_id))
+        os.makedirs(work_dir, exist_ok=True)
+        
+        try:
+            tail_path = checkpoint.get('tail_path')
+            segmenter = IncrementalSegmenter(
+                params['sample_rate'],
+                state=checkpoint.get('segmenter'),
+                tail=np.load(tail_path) if tail_path else None,
+            )
+            
+            # Fetch only the audio past the checkpoint, so each poll costs what
+            # the recording grew by rather than its whole length
+            with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+                output_path = os.path.join(temp_dir, 'audio')
+                download_audio(analysis.url, output_path,
+                               sample_rate=params['sample_rate'], mono=params['mono'],
+                               start=segmenter.duration)
+                with metrics.stage('load'):
+                    y, _ = librosa.load(output_path + '.wav', sr=params['sample_rate'], mono=True,
+                                        res_type=params['res_type'])
+            
+            # Tracks are cut from source.wav, so it holds the whole recording. It is
+            # cut back to the checkpoint first, in case an interrupted run appended.
+            source_path = os.path.join(work_dir, 'source.wav')
+            if os.path.exists(source_path):
+                with sf.SoundFile(source_path, 'r+') as source:
+                    source.truncate(segmenter.processed_samples)
+                    source.seek(0, sf.SEEK_END)
+                    source.write(y)
+            else:
+                sf.write(source_path, y, params['sample_rate'])
+            metrics.AUDIO_SECONDS.inc(len(y) / params['sample_rate'])
+            
+            idle_polls = 0 if len(y) else checkpoint.get('idle_polls', 0) + 1
+            if idle_polls >= app.config['INCREMENTAL_MAX_IDLE_POLLS']:
+                log.info('recording_stopped_growing', idle_polls=idle_polls)
+                final = True
+            
+            with metrics.stage('onset_detection'):
+                segments = segmenter.feed(y)
+                if final:
+                    segments += segmenter.finish()
+            
+            # Peaks of the new audio are appended after those already stored
+            peak_builder = PeakBuilder(app.config['PEAKS_SAMPLES_PER_PEAK'], state=checkpoint.get('peaks'))
+            peaks_offset = peak_builder.length
+            peaks = peak_builder.feed(y)
+            if final:
+                peaks = np.concatenate([peaks, peak_builder.finish()])
+            store_peaks(app.config, analysis_id, peaks, params['sample_rate'], offset=peaks_offset)
+            log.info('increment_analysed',
+                    new_samples=len(y),
+                    processed_seconds=segmenter.duration,
+                    new_segments=len(segments))
+            
+            # Name the tail after the sample count so an interrupted run never
+            # leaves the stored checkpoint pointing at a newer tail
+            new_tail_path = os.path.join(work_dir, f"tail_{segmenter.processed_samples}.npy")
+            np.save(new_tail_path, segmenter.tail)
+            analysis.checkpoint = {
+                **checkpoint,
+                'segmenter': segmenter.state(),
+                'tail_path': new_tail_path,
+                'idle_polls': idle_polls,
+                'peaks': peak_builder.state(),
+            }
+            if final:
+                analysis.status = 'completed'
+                analysis.completed_at = datetime.utcnow()
+                analysis.duration = (analysis.completed_at - analysis.started_at).total_seconds()
+            
+            # Tracks and checkpoint are committed together
+            start_index = Track.query.filter_by(analysis_id=analysis_id).count()
+            with metrics.stage('db_write'):
+                process_segments(analysis_id, segments, source_path, start_index=start_index)
+            if tail_path and tail_path != new_tail_path and os.path.exists(tail_path):
+                os.remove(tail_path)
+            
         except Exception as e:
-            log.error('processing_failed', error=str(e))
+            log.error('incremental_processing_failed', error=str(e))
+            db.session.rollback()
             analysis.status = 'failed'
             analysis.error_message = str(e)
             analysis.completed_at = datetime.utcnow()
             analysis.duration = (analysis.completed_at - analysis.started_at).total_seconds()
-            
-        finally:
             db.session.commit()
+            metrics.ANALYSES_FINISHED.labels(status=analysis.status).inc()
+            return
+        
+        if final:
+            log.info('processing_completed', processing_duration=analysis.duration)
+            metrics.ANALYSES_FINISHED.labels(status=analysis.status).inc()
+        else:
+            process_audio_increment.apply_async(
+                (analysis_id,), countdown=app.config['INCREMENTAL_POLL_INTERVAL'])
@@ -0,0 +1,85 @@
+import re
+
+# A timestamp such as 3:15, 03:15, 1:02:03 or 01:02:03, optionally in brackets
+TIMESTAMP = re.compile(r'[\[(]?\b(?:(\d{1,2}):)?(\d{1,2}):(\d{2})\b[\])]?')
+# Leading list numbering ("1.", "01)", "#3") and separators around the title
+NUMBERING = re.compile(r'^\s*(?:#?\d{1,3}[.)]\s+)?')
+SEPARATORS = ' \t-–—|:.'
+
+CHAPTER_CONFIDENCE = 0.95
+DESCRIPTION_CONFIDENCE = 0.8
+
+def parse_timestamp(hours, minutes, seconds):
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+def entries_with_ends(starts_and_titles, duration):
+    """Close each entry at the next one's start and the last at the end of the mix."""
+    entries = []
+    for i, (start_time, title) in enumerate(starts_and_titles):
+        if i + 1 < len(starts_and_titles):
+            end_time = starts_and_titles[i + 1][0]
+        else:
+            end_time = duration
+        entries.append({
+            'start_time': float(start_time),
+            'end_time': float(end_time),
+            'title': title[:255] or f"Track {i+1}",
+        })
+    return entries
+
+def parse_chapters(chapters, duration):
+    """Entries from yt-dlp chapters ({'start_time', 'end_time', 'title'})."""
+    entries = []
+    for i, chapter in enumerate(chapters or []):
+        end_time = chapter.get('end_time') or duration
+        if end_time is None:
+            return []
+        entries.append({
+            'start_time': float(chapter['start_time']),
+            'end_time': float(end_time),
+            'title': (chapter.get('title') or '').strip()[:255] or f"Track {i+1}",
+        })
+    return entries
+
+def parse_description(description, duration):
+    """Entries from a timestamped tracklist in a description.
+
+    Takes every line with a timestamp, e.g. "00:00 Artist - Title",
+    "[1:02:03] Artist - Title" or "1. Artist - Title (03:15)". The
+    timestamps must increase and fall inside the mix, otherwise the
+    description isn't treated as a tracklist.
+    """
+    if not description or duration is None:
+        return []
+
+    starts_and_titles = []
+    for line in description.splitlines():
+        match = TIMESTAMP.search(line)
+        if not match:
+            continue
+        start_time = parse_timestamp(*match.groups())
+        title = (line[:match.start()] + ' ' + line[match.end():]).strip()
+        title = NUMBERING.sub('', title).strip(SEPARATORS)
+        starts_and_titles.append((start_time, title))
+
+    starts = [start_time for start_time, _ in starts_and_titles]
+    if any(later <= earlier for earlier, later in zip(starts, starts[1:])) \
+            or (starts and starts[-1] >= duration):
+        return []
+    return entries_with_ends(starts_and_titles, duration)
+
+def metadata_tracklist(info):
+    """Tracklist published with the source, preferring chapters over the description.
+
+    Returns (entries, track_type, confidence); entries is empty when the
+    metadata has fewer than two usable tracks.
+    """
+    duration = info.get('duration')
+    entries = parse_chapters(info.get('chapters'), duration)
+    if len(entries) >= 2:
+        return entries, 'chapter', CHAPTER_CONFIDENCE
+
+    entries = parse_description(info.get('description'), duration)
+    if len(entries) >= 2:
+        return entries, 'tracklist', DESCRIPTION_CONFIDENCE
+    return [], None, None
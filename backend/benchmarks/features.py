@@ -0,0 +1,85 @@
+"""Feature extraction cost: one shared STFT versus computing each feature independently.
+
+Runs on a synthetic mix (noise-burst beats over a chord, changing every
+minute) so no audio files or network are needed.
+
+    python benchmarks/features.py --seconds 600 --runs 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import librosa
+from app.features import extract_frames
+from app.options import FEATURES
+
+SR = 22050
+
+def synthetic_mix(seconds, sr=SR):
+    rng = np.random.default_rng(0)
+    y = np.zeros(int(seconds * sr), dtype=np.float32)
+    t = np.arange(sr * 60) / sr
+    burst = (rng.normal(0, 0.5, 2000) * np.exp(-np.arange(2000) / 300)).astype(np.float32)
+    for minute, start in enumerate(range(0, len(y), sr * 60)):
+        root = 110 * 2 ** ((minute * 5 % 12) / 12)
+        chord = sum(np.sin(2 * np.pi * root * ratio * t) for ratio in (1, 1.26, 1.5)) * 0.05
+        y[start:start + len(t)] += chord[:len(y) - start].astype(np.float32)
+        bpm = 118 + minute % 8
+        for beat in np.arange(0, 60, 60 / bpm):
+            onset = start + int(beat * sr)
+            y[onset:onset + len(burst)] += burst[:max(0, len(y) - onset)]
+    return y
+
+def independent(y, sr, features):
+    """Each feature the way librosa computes it on its own, one STFT apiece."""
+    librosa.onset.onset_detect(y=y, sr=sr)
+    if 'tempo' in features:
+        librosa.feature.tempo(y=y, sr=sr)
+    if 'key' in features:
+        librosa.feature.chroma_stft(y=y, sr=sr, tuning=0.0)
+    if 'loudness' in features:
+        librosa.feature.rms(y=y)
+    if 'centroid' in features:
+        librosa.feature.spectral_centroid(y=y, sr=sr)
+
+def shared(y, sr, features):
+    frames = extract_frames(y, sr, features)
+    librosa.onset.onset_detect(onset_envelope=frames['onset'], sr=sr)
+    if 'tempo' in features:
+        librosa.feature.tempo(onset_envelope=frames['onset'], sr=sr)
+
+def timed(function, runs, *args):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=300)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    y = synthetic_mix(args.seconds)
+    # Warm up numba and FFT plans so the first row isn't penalised
+    shared(y[:SR * 5], SR, FEATURES)
+    independent(y[:SR * 5], SR, FEATURES)
+
+    print(f"{args.seconds:.0f}s of audio at {SR} Hz, median of {args.runs} runs")
+    print(f"{'features':<40} {'independent':>12} {'shared':>10} {'speedup':>8}")
+    for count in range(len(FEATURES) + 1):
+        features = FEATURES[:count]
+        alone = timed(independent, args.runs, y, SR, features)
+        together = timed(shared, args.runs, y, SR, features)
+        label = ', '.join(('onsets',) + features)
+        print(f"{label:<40} {alone:>11.2f}s {together:>9.2f}s {alone / together:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""Load test of the API against a seeded database, with no Redis, worker or network.
+
+Seeds Analysis and Track rows into SQLite (or a local Postgres with
+--database-url), serves the API from gunicorn in its own processes, as
+docker-compose does, with the Celery broker swapped for the in-memory
+transport and stub tasks under the names the API enqueues, then drives a
+weighted mix of requests from concurrent clients and reports latency
+percentiles and throughput per endpoint.
+
+    python benchmarks/loadtest.py --analyses 5000 --tracks 25 --concurrency 16 --duration 30
+    python benchmarks/loadtest.py --mix submit=1,poll=20,list=0,download=5
+"""
+import argparse
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests
+from app import create_app
+from app.extensions import celery, db
+from app.models import Analysis, Track
+
+DEFAULT_MIX = 'submit=1,poll=10,list=1,download=3'
+# docker-compose runs the API with this many gunicorn workers
+DEFAULT_WORKERS = 4
+TRACK_TYPES = ('onset_based', 'onset_based', 'onset_based', 'final_segment', 'chapter')
+
+def stub_task(analysis_id):
+    """Stands in for a worker task; the API only needs the name to enqueue it."""
+
+def use_memory_broker():
+    """Send tasks to an in-process broker, with stubs under the real task names.
+
+    Nothing consumes the queue, so submitting costs what it costs the API
+    against Redis minus the network round trip.
+    """
+    celery.conf.update(broker_url='memory://', result_backend='cache+memory://')
+    for name in ('app.tasks.process_audio_url', 'app.tasks.process_audio_increment',
+                 'app.tasks.probe_analysis'):
+        celery.task(name=name)(stub_task)
+
+def server_app():
+    """Gunicorn entry point: the API on the harness's database, with the in-memory broker."""
+    use_memory_broker()
+    return create_app({'SQLALCHEMY_DATABASE_URI': os.environ['LOADTEST_DATABASE_URL']})
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(database_url, workers, temp_dir, timeout=60):
+    """Run gunicorn in separate processes, so the clients here don't share its GIL."""
+    port = free_port()
+    metrics_dir = os.path.join(temp_dir, 'prometheus')
+    os.makedirs(metrics_dir, exist_ok=True)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f"127.0.0.1:{port}", '--workers', str(workers),
+         '--log-level', 'warning', '--pythonpath', os.path.join(BACKEND_DIR, 'benchmarks'),
+         'loadtest:server_app()'],
+        cwd=BACKEND_DIR,
+        env={**os.environ, 'LOADTEST_DATABASE_URL': database_url, 'PROMETHEUS_MULTIPROC_DIR': metrics_dir},
+    )
+    base_url = f"http://127.0.0.1:{port}/api"
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with status {server.returncode}")
+        try:
+            requests.get(f"{base_url}/health", timeout=1).close()
+            return server, base_url
+        except requests.RequestException:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit(f"gunicorn did not start within {timeout}s")
+
+def write_track_audio(path, seconds=1, sample_rate=22050):
+    """A short silent WAV that every seeded track points at, for downloads."""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b'\0\0' * seconds * sample_rate)
+
+def seed(analyses, tracks_per_analysis, audio_path, batch_size=1000):
+    """Insert completed, failed and pending analyses, with tracks on the completed ones.
+
+    Ids come back from the database rather than being chosen here, so its id
+    sequence stays ahead of them and submits during the run don't collide.
+    """
+    rng = random.Random(0)
+    now = datetime.utcnow()
+
+    for start in range(0, analyses, batch_size):
+        analysis_rows, track_rows = [], []
+        for number in range(start, min(start + batch_size, analyses)):
+            status = rng.choices(('completed', 'failed', 'pending'), weights=(90, 5, 5))[0]
+            created_at = now - timedelta(minutes=rng.randint(1, 60 * 24 * 90))
+            source_duration = rng.uniform(30, 240) * 60
+            analysis_rows.append({
+                'url': f"https://soundcloud.com/loadtest/mix-{number}",
+                'status': status,
+                'created_at': created_at,
+                'started_at': created_at + timedelta(seconds=5) if status != 'pending' else None,
+                'completed_at': created_at + timedelta(minutes=3) if status != 'pending' else None,
+                'duration': 175.0 if status != 'pending' else None,
+                'client_id': f"10.0.0.{rng.randint(1, 50)}",
+                'source_duration': source_duration,
+                'error_message': 'Download failed' if status == 'failed' else None,
+                'options': {},
+            })
+            if status != 'completed':
+                continue
+            length = source_duration / tracks_per_analysis
+            for i in range(tracks_per_analysis):
+                bpm = rng.uniform(118, 130)
+                track_rows.append({
+                    # Position in this batch until the analysis has its id
+                    'analysis_id': len(analysis_rows) - 1,
+                    'title': f"Track {i + 1}",
+                    'start_time': i * length,
+                    'end_time': (i + 1) * length,
+                    'confidence': rng.uniform(0.2, 0.9),
+                    'track_type': rng.choice(TRACK_TYPES),
+                    'file_path': audio_path,
+                    'bpm': bpm,
+                    'first_beat': i * length + rng.uniform(0, 60 / bpm),
+                    'key': rng.choice(('A minor', 'C major', 'F# minor', 'D major')),
+                    'loudness': rng.uniform(-14, -6),
+                    'spectral_centroid': rng.uniform(1500, 3500),
+                    'created_at': created_at,
+                })
+        ids = db.session.scalars(
+            db.insert(Analysis).returning(Analysis.id, sort_by_parameter_order=True), analysis_rows
+        ).all()
+        for row in track_rows:
+            row['analysis_id'] = ids[row['analysis_id']]
+        if track_rows:
+            db.session.execute(db.insert(Track), track_rows)
+        db.session.commit()
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+def submit(session, base_url, rng, ids):
+    return session.post(f"{base_url}/analysis",
+                        json={'url': f"https://soundcloud.com/loadtest/new-{rng.getrandbits(32)}"})
+
+def poll(session, base_url, rng, ids):
+    return session.get(f"{base_url}/analysis/{rng.choice(ids['analyses'])}")
+
+def list_analyses(session, base_url, rng, ids):
+    return session.get(f"{base_url}/analyses")
+
+def download(session, base_url, rng, ids):
+    return session.get(f"{base_url}/tracks/{rng.choice(ids['tracks'])}/download")
+
+OPERATIONS = {'submit': submit, 'poll': poll, 'list': list_analyses, 'download': download}
+
+def client(base_url, weights, ids, deadline, seed, results, lock):
+    """One simulated client: pick operations by weight until the deadline."""
+    rng = random.Random(seed)
+    names, values = list(weights), list(weights.values())
+    latencies, errors = defaultdict(list), defaultdict(int)
+
+    with requests.Session() as session:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=values)[0]
+            start = time.perf_counter()
+            try:
+                response = OPERATIONS[name](session, base_url, rng, ids)
+                ok = response.status_code < 400
+                response.close()
+            except requests.RequestException:
+                ok = False
+            latencies[name].append(time.perf_counter() - start)
+            if not ok:
+                errors[name] += 1
+
+    with lock:
+        for name, values in latencies.items():
+            results['latencies'][name].extend(values)
+            results['errors'][name] += errors[name]
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1] if len(values) > 1 else values[0]
+
+def report(results, elapsed):
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    total = 0
+    for name in OPERATIONS:
+        values = results['latencies'].get(name)
+        if not values:
+            continue
+        total += len(values)
+        print(f"{name:<10} {len(values):>9} {results['errors'][name]:>7} {len(values) / elapsed:>8.1f} "
+              f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 99) * 1000:>8.1f} "
+              f"{max(values) * 1000:>8.1f}")
+    print(f"{'total':<10} {total:>9} {sum(results['errors'].values()):>7} {total / elapsed:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='defaults to a fresh SQLite file in a temporary directory')
+    parser.add_argument('--analyses', type=int, default=2000, help='analyses to seed')
+    parser.add_argument('--tracks', type=int, default=25, help='tracks per completed analysis')
+    parser.add_argument('--no-seed', action='store_true', help='reuse rows already in --database-url')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='gunicorn worker processes')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=20, help='seconds to run')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"operation weights (default {DEFAULT_MIX})")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(temp_dir, 'loadtest.db')}"
+        app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+
+        with app.app_context():
+            db.create_all()
+            if not args.no_seed:
+                audio_path = os.path.join(temp_dir, 'track.wav')
+                write_track_audio(audio_path)
+                start = time.perf_counter()
+                seed(args.analyses, args.tracks, audio_path)
+                print(f"seeded {args.analyses} analyses in {time.perf_counter() - start:.1f}s")
+            ids = {
+                'analyses': [row[0] for row in db.session.execute(db.select(Analysis.id))],
+                'tracks': [row[0] for row in db.session.execute(db.select(Track.id))],
+            }
+            db.session.remove()
+        if not ids['analyses'] or (not ids['tracks'] and 'download' in weights):
+            raise SystemExit('Nothing to request; seed some analyses with tracks first')
+        print(f"{len(ids['analyses'])} analyses, {len(ids['tracks'])} tracks in {database_url.split(':')[0]}")
+
+        server, base_url = start_server(database_url, args.workers, temp_dir)
+        results = {'latencies': defaultdict(list), 'errors': defaultdict(int)}
+        lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + args.duration
+        clients = [threading.Thread(target=client, args=(base_url, weights, ids, deadline, seed, results, lock))
+                   for seed in range(args.concurrency)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        server.terminate()
+        server.wait()
+
+        print(f"{args.concurrency} clients against {args.workers} workers for {elapsed:.1f}s, mix {args.mix}")
+        report(results, elapsed)
+    return 1 if sum(results['errors'].values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
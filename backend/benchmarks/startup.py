@@ -0,0 +1,62 @@
+"""Startup cost of the API: time and peak RSS to import the app and run create_app().
+
+Each run uses a fresh interpreter so import caches don't hide regressions.
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that belong to the Celery worker only; the API must not load them
+HEAVY_MODULES = ('librosa', 'numpy', 'scipy', 'numba', 'pyarrow', 'yt_dlp', 'structlog', 'app.tasks')
+
+PROBE = f"""
+import json, resource, sys, time
+baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'rss_delta_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss,
+    'heavy_modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+def measure():
+    """Run create_app() in a fresh interpreter and return its measurements."""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    seconds = [run['seconds'] for run in runs]
+    rss = [run['rss_kib'] / 1024 for run in runs]
+    print(f"create_app() import+init: median {statistics.median(seconds) * 1000:.0f} ms, "
+          f"max {max(seconds) * 1000:.0f} ms over {args.runs} runs")
+    print(f"peak RSS: median {statistics.median(rss):.1f} MiB, "
+          f"growth during startup {statistics.median(r['rss_delta_kib'] for r in runs) / 1024:.1f} MiB")
+    heavy = sorted({m for run in runs for m in run['heavy_modules']})
+    print(f"worker-only modules loaded: {', '.join(heavy) if heavy else 'none'}")
+    return 1 if heavy else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
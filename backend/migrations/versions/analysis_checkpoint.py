@@ -0,0 +1,24 @@
+"""Add analysis checkpoint
+
+Revision ID: analysis_checkpoint
+Revises: analysis_profiling
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'analysis_checkpoint'
+down_revision = 'analysis_profiling'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('analysis', sa.Column('checkpoint', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('analysis', 'checkpoint')
@@ -0,0 +1,24 @@
+"""Add finalize_requested_at to analysis
+
+Revision ID: analysis_finalize
+Revises: track_analysis_index
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'analysis_finalize'
+down_revision = 'track_analysis_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('analysis', sa.Column('finalize_requested_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('analysis', 'finalize_requested_at')
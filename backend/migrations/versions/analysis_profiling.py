@@ -0,0 +1,26 @@
+"""Add analysis options and profiler artifact path
+
+Revision ID: analysis_profiling
+Revises: initial_schema
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'analysis_profiling'
+down_revision = 'initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('analysis', sa.Column('options', sa.JSON(), nullable=True))
+    op.add_column('analysis', sa.Column('profile_path', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    op.drop_column('analysis', 'profile_path')
+    op.drop_column('analysis', 'options')
@@ -0,0 +1,32 @@
+"""Add probed source metadata and scheduling columns to analysis
+
+Revision ID: analysis_scheduling
+Revises: analysis_checkpoint
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'analysis_scheduling'
+down_revision = 'analysis_checkpoint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('analysis', sa.Column('client_id', sa.String(length=100), nullable=True))
+    op.add_column('analysis', sa.Column('source_duration', sa.Float(), nullable=True))
+    op.add_column('analysis', sa.Column('source_size', sa.BigInteger(), nullable=True))
+    op.add_column('analysis', sa.Column('dispatched_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_analysis_status'), 'analysis', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_analysis_status'), table_name='analysis')
+    op.drop_column('analysis', 'dispatched_at')
+    op.drop_column('analysis', 'source_size')
+    op.drop_column('analysis', 'source_duration')
+    op.drop_column('analysis', 'client_id')
@@ -0,0 +1,23 @@
+"""Index tracks by analysis and start time
+
+Revision ID: track_analysis_index
+Revises: track_features
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'track_analysis_index'
+down_revision = 'track_features'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tracks_analysis_id_start_time', 'tracks', ['analysis_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tracks_analysis_id_start_time', table_name='tracks')
@@ -0,0 +1,24 @@
+"""Add the beat grid phase to tracks
+
+Revision ID: track_beats
+Revises: analysis_finalize
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'track_beats'
+down_revision = 'analysis_finalize'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tracks', sa.Column('first_beat', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('tracks', 'first_beat')
@@ -0,0 +1,30 @@
+"""Add per-track audio features to tracks
+
+Revision ID: track_features
+Revises: analysis_scheduling
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'track_features'
+down_revision = 'analysis_scheduling'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tracks', sa.Column('bpm', sa.Float(), nullable=True))
+    op.add_column('tracks', sa.Column('key', sa.String(length=20), nullable=True))
+    op.add_column('tracks', sa.Column('loudness', sa.Float(), nullable=True))
+    op.add_column('tracks', sa.Column('spectral_centroid', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('tracks', 'spectral_centroid')
+    op.drop_column('tracks', 'loudness')
+    op.drop_column('tracks', 'key')
+    op.drop_column('tracks', 'bpm')
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from app import create_app
+from app.extensions import db
+from app.tasks import process_audio_url
+
+SR = 22050
+
+def clicks(seconds, every=8.0):
+    """Mono audio with a loud click every `every` seconds, starting at 1s."""
+    y = np.zeros(int(SR * seconds), dtype=np.float32)
+    for t in np.arange(1.0, seconds, every):
+        start = int(t * SR)
+        y[start:start + SR // 100] = 0.9
+    return y
+
+@pytest.fixture
+def config(tmp_path):
+    """Config for running tasks in-process; override it in a module to add keys."""
+    return {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'WORK_FOLDER': str(tmp_path / 'work'),
+        'PEAKS_FOLDER': str(tmp_path / 'peaks'),
+        'ANALYSIS_SAMPLE_RATE': SR,
+    }
+
+@pytest.fixture
+def app(config, monkeypatch):
+    # The task builds its own app; point it at the same database
+    monkeypatch.setattr('app.create_app', lambda: create_app(config))
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """IDs of the analyses sent to the processing workers, instead of sending them."""
+    dispatched = []
+    monkeypatch.setattr(process_audio_url, 'delay', dispatched.append)
+    return dispatched
@@ -0,0 +1,160 @@
+import os
+import numpy as np
+import pytest
+import soundfile as sf
+from app.extensions import db
+from app.models import Analysis, Track
+from app import signatures
+from app.tasks import process_audio_url
+from .conftest import SR, clicks
+
+@pytest.fixture
+def analysis(app):
+    analysis = Analysis(url='https://test.com/mix')
+    db.session.add(analysis)
+    db.session.commit()
+    return analysis
+
+def fake_download(url, output_path, sample_rate=None, mono=False):
+    sf.write(output_path + '.wav', clicks(40), SR)
+
+def fail(*args, **kwargs):
+    raise AssertionError('stage should have been resumed from the checkpoint')
+
+def run(analysis_id):
+    process_audio_url.apply(args=[analysis_id])
+    db.session.expire_all()
+    return db.session.get(Analysis, analysis_id)
+
+def test_task_is_acknowledged_late():
+    assert process_audio_url.acks_late
+    assert process_audio_url.reject_on_worker_lost
+
+def test_completed_task_clears_checkpoint(app, analysis, monkeypatch):
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+
+    analysis = run(analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert analysis.checkpoint is None
+    assert len(analysis.tracks) == 5
+    assert all(track.bpm and track.key and track.loudness is not None for track in analysis.tracks)
+    assert not os.path.exists(os.path.join(app.config['WORK_FOLDER'], str(analysis.id)))
+
+def test_redelivered_task_is_skipped(app, analysis, monkeypatch):
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    run(analysis.id)
+
+    # Worker died after finishing but before acknowledging; the message comes back
+    monkeypatch.setattr('app.tasks.download_audio', fail)
+    analysis = run(analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert len(analysis.tracks) == 5
+
+def test_failed_task_keeps_checkpoint(app, analysis, monkeypatch):
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr('app.tasks.detect_onsets', lambda *args, **kwargs: 1 / 0)
+
+    analysis = run(analysis.id)
+    assert analysis.status == 'failed'
+    assert os.path.exists(analysis.checkpoint['source_path'])
+    assert 'onsets_path' not in analysis.checkpoint
+
+def test_resume_skips_download(app, analysis, monkeypatch):
+    work_dir = os.path.join(app.config['WORK_FOLDER'], str(analysis.id))
+    os.makedirs(work_dir)
+    source_path = os.path.join(work_dir, 'source.wav')
+    fake_download(analysis.url, source_path[:-len('.wav')])
+    analysis.status = 'processing'
+    analysis.checkpoint = {'attempts': 1, 'source_path': source_path}
+    db.session.commit()
+    monkeypatch.setattr('app.tasks.download_audio', fail)
+
+    analysis = run(analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert len(analysis.tracks) == 5
+
+def test_resume_skips_onset_detection(app, analysis, monkeypatch):
+    work_dir = os.path.join(app.config['WORK_FOLDER'], str(analysis.id))
+    os.makedirs(work_dir)
+    onsets_path = os.path.join(work_dir, 'onsets.npy')
+    np.save(onsets_path, np.array([0.0, 10.0, 30.0]))
+    analysis.checkpoint = {
+        'attempts': 1,
+        'source_path': os.path.join(work_dir, 'missing.wav'),
+        'onsets_path': onsets_path,
+        'audio_duration': 45.0,
+    }
+    db.session.commit()
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr('app.tasks.detect_onsets', fail)
+
+    analysis = run(analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert [(t.start_time, t.end_time) for t in analysis.tracks] == [(0.0, 10.0), (10.0, 30.0), (30.0, 45.0)]
+
+def test_resume_does_not_duplicate_tracks(app, analysis, monkeypatch):
+    work_dir = os.path.join(app.config['WORK_FOLDER'], str(analysis.id))
+    os.makedirs(work_dir)
+    onsets_path = os.path.join(work_dir, 'onsets.npy')
+    np.save(onsets_path, np.array([0.0, 10.0]))
+    source_path = os.path.join(work_dir, 'source.wav')
+    open(source_path, 'wb').close()
+    db.session.add(Track(analysis_id=analysis.id, title='Track 1', start_time=0.0, end_time=10.0,
+                         confidence=0.2, track_type='onset_based', file_path=source_path))
+    analysis.checkpoint = {
+        'attempts': 1,
+        'source_path': source_path,
+        'onsets_path': onsets_path,
+        'audio_duration': 12.0,
+        'tracks_written': True,
+    }
+    db.session.commit()
+
+    analysis = run(analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert len(analysis.tracks) == 1
+
+def test_gives_up_after_max_attempts(app, analysis, monkeypatch):
+    analysis.checkpoint = {'attempts': app.config['TASK_MAX_ATTEMPTS']}
+    db.session.commit()
+    monkeypatch.setattr('app.tasks.download_audio', fail)
+
+    analysis = run(analysis.id)
+    assert analysis.status == 'failed'
+    assert 'interrupted' in analysis.error_message
+
+def test_retry_endpoint(app, analysis, monkeypatch):
+    queued = []
+    monkeypatch.setattr(signatures.probe_analysis, 'delay', queued.append)
+    analysis.status = 'failed'
+    analysis.error_message = 'worker lost'
+    analysis.checkpoint = {'attempts': 3, 'source_path': '/tmp/source.wav'}
+    db.session.commit()
+    client = app.test_client()
+
+    response = client.post(f'/api/analysis/{analysis.id}/retry')
+    assert response.status_code == 202
+    assert queued == [analysis.id]
+    db.session.refresh(analysis)
+    assert analysis.status == 'pending'
+    assert analysis.error_message is None
+    assert analysis.checkpoint == {'attempts': 0, 'source_path': '/tmp/source.wav'}
+
+    response = client.post(f'/api/analysis/{analysis.id}/retry')
+    assert response.status_code == 409
+
+def test_delete_removes_work_folder(app, analysis, tmp_path, monkeypatch):
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr('app.tasks.detect_onsets', lambda *args, **kwargs: 1 / 0)
+    analysis = run(analysis.id)
+    assert analysis.status == 'failed'
+    work_dir = os.path.dirname(analysis.checkpoint['source_path'])
+    profile_path = str(tmp_path / 'profile.json')
+    open(profile_path, 'w').close()
+    analysis.profile_path = profile_path
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/analysis/{analysis.id}')
+    assert response.status_code == 200
+    assert not os.path.exists(work_dir)
+    assert not os.path.exists(profile_path)
@@ -0,0 +1,87 @@
+import io
+import json
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from app.export import export_analyses
+from app.extensions import db
+from app.models import Analysis, Track
+
+@pytest.fixture
+def config(config):
+    return {**config, 'EXPORT_BATCH_SIZE': 1}
+
+@pytest.fixture(autouse=True)
+def analyses(app):
+    """Four mixes on consecutive days of March 2026, two of them with tracks."""
+    for day, (status, tracks) in enumerate([('completed', 4), ('failed', 0), ('completed', 2), ('pending', 0)], start=1):
+        analysis = Analysis(url=f'https://test.com/mix{day}', status=status,
+                            client_id='10.0.0.1', created_at=datetime(2026, 3, day))
+        db.session.add(analysis)
+        for i in range(tracks):
+            analysis.tracks.append(Track(title=f'Track {i + 1}', start_time=i * 60.0,
+                                         end_time=(i + 1) * 60.0, confidence=0.5,
+                                         track_type='onset_based', bpm=124.0, key='A minor'))
+    db.session.commit()
+
+def read_ndjson(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+def test_ndjson(client):
+    response = client.get('/api/export')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    records = read_ndjson(response.data)
+    assert [record['url'][-4:] for record in records] == ['mix1', 'mix2', 'mix3', 'mix4']
+    assert [len(record['tracks']) for record in records] == [4, 0, 2, 0]
+    assert records[0]['created_at'] == '2026-03-01T00:00:00'
+    assert 'client_id' not in records[0]  # submitters' addresses stay private
+    assert records[0]['tracks'][1] == {
+        'id': 2, 'title': 'Track 2', 'start_time': 60.0, 'end_time': 120.0, 'confidence': 0.5,
+        'track_type': 'onset_based', 'bpm': 124.0, 'first_beat': None, 'key': 'A minor', 'loudness': None,
+        'spectral_centroid': None,
+    }
+
+def test_batches_never_split_an_analysis(app):
+    # batch_size analyses per chunk, each with all of its tracks
+    chunks = list(export_analyses('ndjson', batch_size=3))
+    assert [len(read_ndjson(chunk)) for chunk in chunks] == [3, 1]
+
+def test_filters(client):
+    records = read_ndjson(client.get('/api/export?status=completed,failed&since=2026-03-02').data)
+    assert [record['url'][-4:] for record in records] == ['mix2', 'mix3']
+    records = read_ndjson(client.get('/api/export?until=2026-03-02').data)
+    assert [record['url'][-4:] for record in records] == ['mix1']
+
+def test_parquet(client):
+    response = client.get('/api/export?format=parquet&status=completed')
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.data))
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column('status').to_pylist() == ['completed', 'completed']
+    assert 'client_id' not in table.column_names
+    assert [len(tracks) for tracks in table.column('tracks').to_pylist()] == [4, 2]
+    # Track fields are stored as their own columns
+    starts = table.column('tracks').combine_chunks().flatten().field('start_time')
+    assert starts.to_pylist() == [0.0, 60.0, 120.0, 180.0, 0.0, 60.0]
+
+def test_arrow_stream(client):
+    response = client.get('/api/export?format=arrow')
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert table.num_rows == 4
+    assert table.column('created_at').type == pa.timestamp('us')
+
+def test_invalid_parameters(client):
+    assert client.get('/api/export?format=csv').status_code == 400
+    assert client.get('/api/export?since=last-week').status_code == 400
+
+def test_cli(app, tmp_path):
+    output = tmp_path / 'analyses.parquet'
+    result = app.test_cli_runner().invoke(args=[
+        'export', '--format', 'parquet', '--status', 'completed', '--since', '2026-03-02',
+        '--output', str(output),
+    ])
+    assert result.exit_code == 0, result.output
+    assert pq.read_table(output).column('url').to_pylist() == ['https://test.com/mix3']
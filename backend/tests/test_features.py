@@ -0,0 +1,70 @@
+import numpy as np
+import librosa
+import pytest
+from app.features import beat_grid, estimate_key, extract_frames, summarize
+
+SR = 22050
+
+def tone(freqs, seconds, amplitude=0.5):
+    t = np.arange(int(SR * seconds)) / SR
+    return (amplitude * sum(np.sin(2 * np.pi * f * t) for f in freqs) / len(freqs)).astype(np.float32)
+
+def beats(bpm, seconds):
+    """Decaying noise bursts on every beat."""
+    rng = np.random.default_rng(0)
+    y = np.zeros(int(SR * seconds), dtype=np.float32)
+    burst = rng.normal(0, 0.5, 2000) * np.exp(-np.arange(2000) / 300)
+    for t in np.arange(0.5, seconds - 0.1, 60.0 / bpm):
+        start = int(t * SR)
+        y[start:start + len(burst)] += burst
+    return y
+
+@pytest.mark.parametrize('block_frames', [2048, 100])
+def test_onset_envelope_matches_librosa(block_frames):
+    y = beats(128, 20) + tone([220], 20, amplitude=0.05)
+    frames = extract_frames(y, SR, features=(), block_frames=block_frames)
+    assert set(frames) == {'onset'}
+    # The log-mel floor is per block, so only the single-block case is exact
+    expected = librosa.onset.onset_strength(y=y, sr=SR)
+    assert frames['onset'].shape == expected.shape
+    if block_frames >= len(expected):
+        assert np.allclose(frames['onset'], expected)
+    assert np.array_equal(librosa.onset.onset_detect(onset_envelope=frames['onset'], sr=SR),
+                          librosa.onset.onset_detect(onset_envelope=expected, sr=SR))
+
+def test_series_share_one_spectrogram():
+    y = tone([440], 5)
+    frames = extract_frames(y, SR)
+    S = np.abs(librosa.stft(y))
+    # Same level as time-domain RMS, away from the padded edges
+    assert np.allclose(frames['rms'][5:-5], librosa.feature.rms(y=y)[0][5:-5], rtol=0.01)
+    assert np.allclose(frames['centroid'], librosa.feature.spectral_centroid(S=S, sr=SR)[0])
+    assert frames['chroma'].shape == (12, S.shape[1])
+
+def test_summarize_track():
+    # A C major chord with the tonic doubled in two octaves
+    y = np.concatenate([beats(120, 30), tone([130.81, 261.63, 329.63, 392.0, 523.25], 30)])
+    frames = extract_frames(y, SR)
+
+    first = summarize(frames, 0.0, 30.0, SR)
+    assert first['bpm'] == pytest.approx(120, abs=0.1)
+    # The grid lands on the bursts, every half second
+    assert first['first_beat'] % 0.5 == pytest.approx(0.0, abs=0.05)
+    second = summarize(frames, 30.0, 60.0, SR, features=('key', 'loudness'))
+    assert set(second) == {'key', 'loudness'}
+    assert second['key'] == 'C major'
+    # Five equal sines summing to 0.5 peak
+    assert second['loudness'] == pytest.approx(20 * np.log10(0.5 / 5 * np.sqrt(5 / 2)), abs=0.5)
+
+def test_estimate_key_minor():
+    chroma = np.zeros((12, 10))
+    chroma[[9, 0, 4]] = 1.0  # A, C, E
+    chroma[[2, 7]] = 0.3
+    assert estimate_key(chroma) == 'A minor'
+
+def test_centroid_of_a_sine():
+    frames = extract_frames(tone([1000], 3), SR, features=('centroid',))
+    assert summarize(frames, 0.5, 2.5, SR, features=('centroid',))['spectral_centroid'] == pytest.approx(1000, rel=0.05)
+
+def test_beat_grid_of_silence():
+    assert beat_grid(np.zeros(1000), 120.0, SR)[1].size == 0
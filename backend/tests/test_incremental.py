@@ -0,0 +1,158 @@
+from datetime import datetime
+import numpy as np
+import soundfile as sf
+from app.extensions import db
+from app.incremental import IncrementalSegmenter
+from app.models import Analysis, Track
+from app.tasks import process_audio_increment
+from .conftest import SR, clicks
+
+def feed_in_blocks(segmenter, y, block_seconds):
+    segments = []
+    step = int(block_seconds * SR)
+    for start in range(0, len(y), step):
+        segments += segmenter.feed(y[start:start + step])
+    return segments + segmenter.finish()
+
+def boundaries(segments):
+    return [round(s['start_time'], 1) for s in segments]
+
+def test_blocks_match_single_pass():
+    y = clicks(60)
+    whole = feed_in_blocks(IncrementalSegmenter(SR), y, 60)
+    blocks = feed_in_blocks(IncrementalSegmenter(SR), y, 7.3)
+
+    assert boundaries(blocks) == boundaries(whole)
+    # The 57s onset leaves only 3s, too short for a final segment
+    assert boundaries(whole) == [1.0, 9.0, 17.0, 25.0, 33.0, 41.0, 49.0]
+    assert [s['type'] for s in blocks][-1] == 'onset_based'
+
+def test_segments_are_final_and_ordered():
+    y = clicks(60)
+    segmenter = IncrementalSegmenter(SR)
+    emitted = []
+    for start in range(0, len(y), SR * 5):
+        new = segmenter.feed(y[start:start + SR * 5])
+        # Nothing is emitted past the audio seen so far
+        assert all(s['end_time'] <= segmenter.duration for s in new)
+        emitted += new
+    emitted += segmenter.finish()
+
+    for previous, current in zip(emitted, emitted[1:]):
+        assert previous['end_time'] <= current['start_time']
+
+def test_resume_from_state():
+    y = clicks(60)
+    first = IncrementalSegmenter(SR)
+    segments = first.feed(y[:SR * 27])
+
+    resumed = IncrementalSegmenter(SR, state=first.state(), tail=first.tail.copy())
+    segments += resumed.feed(y[SR * 27:]) + resumed.finish()
+
+    expected = feed_in_blocks(IncrementalSegmenter(SR), y, 60)
+    assert boundaries(segments) == boundaries(expected)
+
+def test_silence_is_one_full_track():
+    segmenter = IncrementalSegmenter(SR)
+    segments = segmenter.feed(np.zeros(SR * 20, dtype=np.float32)) + segmenter.finish()
+    assert segments == [{'start_time': 0.0, 'end_time': 20.0, 'confidence': 0.9, 'type': 'full_track'}]
+
+def test_increment_task_appends_tracks(app, monkeypatch):
+    recording = clicks(60)
+    available = {'seconds': 30}
+
+    starts = []
+
+    def fake_download(url, output_path, sample_rate=None, mono=False, start=None):
+        starts.append(start)
+        sf.write(output_path + '.wav', recording[int((start or 0) * SR):int(available['seconds'] * SR)], SR)
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr('app.tasks.probe_source', lambda url: {'duration': 30.0})
+    scheduled = []
+    monkeypatch.setattr(process_audio_increment, 'apply_async',
+                        lambda args, countdown: scheduled.append(args))
+
+    analysis = Analysis(url='https://test.com/live', options={'incremental': True})
+    db.session.add(analysis)
+    db.session.commit()
+    analysis_id = analysis.id
+
+    process_audio_increment.apply(args=[analysis_id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis_id)
+    assert analysis.status == 'live'
+    assert len(analysis.tracks) == 3  # 1-9, 9-17, 17-25; 25-33 isn't closed yet
+    assert scheduled == [(analysis_id,)]
+
+    available['seconds'] = 60
+    analysis.finalize_requested_at = datetime.utcnow()
+    db.session.commit()
+    process_audio_increment.apply(args=[analysis_id])
+    db.session.expire_all()
+
+    analysis = db.session.get(Analysis, analysis_id)
+    assert analysis.status == 'completed'
+    tracks = Track.query.filter_by(analysis_id=analysis_id).order_by(Track.start_time).all()
+    assert [round(t.start_time) for t in tracks] == [1, 9, 17, 25, 33, 41, 49]
+    assert [t.title for t in tracks] == [f"Track {i}" for i in range(1, 8)]
+    assert len(scheduled) == 1
+    # The second poll only fetched what was added, yet tracks see the whole recording
+    assert starts == [0.0, 30.0]
+    assert sf.info(tracks[0].file_path).duration == 60.0
+
+def test_live_stream_is_rejected(app, monkeypatch):
+    monkeypatch.setattr('app.tasks.probe_source', lambda url: {'is_live': True})
+    monkeypatch.setattr('app.tasks.download_audio', lambda *args, **kwargs: 1 / 0)
+    analysis = Analysis(url='https://test.com/stream', options={'incremental': True})
+    db.session.add(analysis)
+    db.session.commit()
+
+    process_audio_increment.apply(args=[analysis.id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis.id)
+    assert analysis.status == 'failed'
+    assert 'Live streams' in analysis.error_message
+
+def test_finalize_endpoint(app):
+    client = app.test_client()
+    live = Analysis(url='https://test.com/live', status='live', options={'incremental': True},
+                    checkpoint={'idle_polls': 2})
+    done = Analysis(url='https://test.com/done', status='completed', options={'incremental': True})
+    batch = Analysis(url='https://test.com/mix', status='pending')
+    db.session.add_all([live, done, batch])
+    db.session.commit()
+
+    response = client.post(f'/api/analysis/{live.id}/finalize')
+    assert response.status_code == 202
+    db.session.refresh(live)
+    assert live.finalize_requested_at is not None
+    assert live.checkpoint == {'idle_polls': 2}
+
+    for analysis in (done, batch):
+        response = client.post(f'/api/analysis/{analysis.id}/finalize')
+        assert response.status_code == 409
+
+def test_finalize_survives_running_increment(app, monkeypatch):
+    analysis = Analysis(url='https://test.com/live', status='live', options={'incremental': True},
+                        started_at=datetime.utcnow())
+    db.session.add(analysis)
+    db.session.commit()
+    analysis_id = analysis.id
+    client = app.test_client()
+
+    # Finalize while the increment is analysing; its checkpoint write comes after
+    def fake_download(url, output_path, sample_rate=None, mono=False, start=None):
+        assert client.post(f'/api/analysis/{analysis_id}/finalize').status_code == 202
+        sf.write(output_path + '.wav', clicks(30), SR)
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr(process_audio_increment, 'apply_async', lambda args, countdown: None)
+
+    process_audio_increment.apply(args=[analysis_id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis_id)
+    assert analysis.status == 'live'
+    assert analysis.finalize_requested_at is not None
+
+    process_audio_increment.apply(args=[analysis_id])
+    db.session.expire_all()
+    assert db.session.get(Analysis, analysis_id).status == 'completed'
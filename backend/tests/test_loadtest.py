@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_loadtest_runs_offline():
+    # Fresh interpreter: the harness swaps the Celery broker for memory://
+    result = subprocess.run(
+        [sys.executable, 'benchmarks/loadtest.py',
+         '--analyses', '50', '--tracks', '5', '--concurrency', '2', '--duration', '1',
+         '--mix', 'submit=1,poll=1,list=1,download=1'],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    report = {line.split()[0]: line.split() for line in result.stdout.splitlines() if line}
+    for endpoint in ('submit', 'poll', 'list', 'download'):
+        assert report[endpoint][2] == '0'  # no errors
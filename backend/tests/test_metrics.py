@@ -0,0 +1,45 @@
+import pytest
+from app import metrics
+
+def stage_count(name):
+    return metrics.registry().get_sample_value(
+        'flacjacket_stage_duration_seconds_count', {'stage': name}) or 0
+
+def test_stage_records_duration():
+    before = stage_count('load')
+    with metrics.stage('load'):
+        pass
+    assert stage_count('load') == before + 1
+
+def test_stage_records_duration_on_error():
+    before = stage_count('segmentation')
+    with pytest.raises(ValueError):
+        with metrics.stage('segmentation'):
+            raise ValueError('boom')
+    assert stage_count('segmentation') == before + 1
+
+def test_observe_task_records_resources():
+    before = metrics.registry().get_sample_value('flacjacket_task_peak_memory_bytes_count') or 0
+    started = metrics.start_task()
+    metrics.observe_task(started, audio_duration=60.0)
+    expected = before + 1 if started[1] else before
+    assert metrics.registry().get_sample_value('flacjacket_task_peak_memory_bytes_count') == expected
+    assert metrics.peak_memory_bytes() > 0
+
+def test_peak_memory_is_per_task():
+    if not metrics.reset_peak_memory():
+        pytest.skip('peak RSS cannot be reset on this platform')
+    block = bytearray(200 * 1024 * 1024)
+    block[::4096] = b'x' * len(block[::4096])  # touch every page
+    peak = metrics.peak_memory_bytes()
+    del block
+    assert metrics.reset_peak_memory()
+    assert metrics.peak_memory_bytes() < peak - 100 * 1024 * 1024
+
+def test_metrics_endpoint(client):
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    body = response.get_data(as_text=True)
+    assert 'flacjacket_stage_duration_seconds' in body
+    assert 'flacjacket_queue_wait_seconds' in body
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import soundfile as sf
+from app import create_app
+from app.options import analysis_params, validate_options
+from app.tasks import analyze_audio
+
+def write_clicks(path, sr, seconds=12):
+    """Write a mono WAV with a loud click every 6 seconds."""
+    y = np.zeros(sr * seconds, dtype=np.float32)
+    for start in range(0, len(y), sr * 6):
+        y[start:start + sr // 100] = 0.9
+    sf.write(path, y, sr)
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'profile': True},
+    {'sample_rate': 16000, 'res_type': 'soxr_mq', 'mono': False},
+])
+def test_valid_options(options):
+    assert validate_options(options) is None
+
+@pytest.mark.parametrize('options', [
+    [],
+    {'profile': 'yes'},
+    {'sample_rate': 1000},
+    {'sample_rate': '22050'},
+    {'sample_rate': True},
+    {'res_type': 'kaiser_best'},
+    {'mono': 1},
+    {'features': 'tempo'},
+    {'features': ['tempo', 'mood']},
+])
+def test_invalid_options(options):
+    assert validate_options(options)
+
+def test_analysis_params_defaults(app):
+    assert analysis_params({}, app.config) == {
+        'sample_rate': app.config['ANALYSIS_SAMPLE_RATE'],
+        'res_type': app.config['ANALYSIS_RES_TYPE'],
+        'mono': app.config['ANALYSIS_MONO'],
+        'features': app.config['ANALYSIS_FEATURES'],
+    }
+    params = analysis_params({'sample_rate': 16000, 'mono': False}, app.config)
+    assert params['sample_rate'] == 16000
+    assert params['mono'] is False
+
+def test_unknown_default_features_fail_at_startup():
+    with pytest.raises(ValueError, match='bpm'):
+        create_app({'TESTING': True, 'ANALYSIS_FEATURES': ('bpm', 'key')})
+
+def test_start_analysis_rejects_invalid_options(client):
+    response = client.post('/api/analysis', json={
+        'url': 'https://www.youtube.com/watch?v=test',
+        'options': {'sample_rate': 'fast'},
+    })
+    assert response.status_code == 400
+    assert 'sample_rate' in response.get_json()['error']
+
+def test_analyze_audio_at_native_rate_skips_resampling(tmp_path, monkeypatch):
+    path = str(tmp_path / 'audio.wav')
+    write_clicks(path, 16000)
+
+    def fail_resample(*args, **kwargs):
+        raise AssertionError('audio decoded at the analysis rate should not be resampled')
+    monkeypatch.setattr('soxr.resample', fail_resample)
+
+    segments, duration = analyze_audio(path, sample_rate=16000)
+    assert duration == pytest.approx(12.0)
+    assert segments
+
+def test_analyze_audio_resamples_other_rates(tmp_path):
+    path = str(tmp_path / 'audio.wav')
+    write_clicks(path, 44100)
+
+    segments, duration = analyze_audio(path, sample_rate=22050, res_type='soxr_lq')
+    assert duration == pytest.approx(12.0)
+    assert segments
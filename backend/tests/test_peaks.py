@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import soundfile as sf
+from app import peak_files, peaks
+from app.extensions import db
+from app.models import Analysis
+from app.tasks import process_audio_url
+from .conftest import SR
+
+
+def noise(seconds, seed=0):
+    return np.random.default_rng(seed).uniform(-0.8, 0.8, int(SR * seconds)).astype(np.float32)
+
+def test_blocks_match_whole_recording():
+    y = noise(3)
+    expected = peaks.compute_peaks(y, 256)
+    assert expected.shape == (len(y) // 256 + 1, 2)
+
+    # Odd block sizes, with the partial peak checkpointed between blocks
+    state, chunks = None, []
+    for block in np.array_split(y, 7):
+        builder = peaks.PeakBuilder(256, state=state)
+        chunks.append(builder.feed(block))
+        state = builder.state()
+    chunks.append(peaks.PeakBuilder(256, state=state).finish())
+    assert np.array_equal(np.concatenate(chunks), expected)
+
+def test_file_peaks_match_loaded_audio(tmp_path):
+    y = noise(3)
+    path = str(tmp_path / 'source.wav')
+    sf.write(path, y, SR, subtype='FLOAT')
+    assert np.array_equal(peaks.file_peaks(path, 256, blocksize=1000), peaks.compute_peaks(y, 256))
+
+def test_coarser_levels_are_exact(tmp_path):
+    y = noise(10)
+    index = peaks.write_peaks(str(tmp_path), peaks.compute_peaks(y, 256), SR, 256, levels=3, factor=4)
+    assert [level['samples_per_peak'] for level in index['levels']] == [256, 1024, 4096]
+
+    coarsest = np.fromfile(peak_files.level_path(str(tmp_path), 2), dtype=np.int8).reshape(-1, 2)
+    assert len(coarsest) == index['levels'][2]['length'] == -(-len(y) // 4096)
+    assert np.array_equal(coarsest, peaks.quantize(peaks.compute_peaks(y, 4096), 8))
+
+def test_append_overwrites_from_offset(tmp_path):
+    folder = str(tmp_path)
+    first = np.array([[-0.5, 0.5]] * 4, dtype=np.float32)
+    second = np.array([[-1.0, 1.0]] * 2, dtype=np.float32)
+    peaks.write_peaks(folder, first, SR, 256, levels=2, bits=16)
+    peaks.write_peaks(folder, second, SR, 256, levels=2, bits=16, offset=4)
+    # A re-run block replaces what it wrote before instead of appending twice
+    index = peaks.write_peaks(folder, second, SR, 256, levels=2, bits=16, offset=4)
+    assert [level['length'] for level in index['levels']] == [6, 2]
+
+    finest = np.fromfile(peak_files.level_path(folder, 0), dtype=np.int16).reshape(-1, 2)
+    assert finest[:, 1].tolist() == [16384] * 4 + [32767] * 2
+
+
+def test_analysis_serves_peaks(app, monkeypatch):
+    def fake_download(url, output_path, sample_rate=None, mono=False):
+        sf.write(output_path + '.wav', noise(30), SR)
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    analysis = Analysis(url='https://test.com/mix')
+    db.session.add(analysis)
+    db.session.commit()
+    process_audio_url.apply(args=[analysis.id])
+    client = app.test_client()
+
+    response = client.get(f'/api/analysis/{analysis.id}/peaks')
+    assert response.status_code == 200
+    index = response.get_json()
+    assert index['sample_rate'] == SR
+    assert index['levels'][0]['length'] == -(-30 * SR // 256)
+
+    response = client.get(f'/api/analysis/{analysis.id}/peaks/2', headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 206
+    assert len(response.data) == 100
+    assert client.get(f'/api/analysis/{analysis.id}/peaks/99').status_code == 404
+
+    client.delete(f'/api/analysis/{analysis.id}')
+    assert not os.path.exists(os.path.join(app.config['PEAKS_FOLDER'], str(analysis.id)))
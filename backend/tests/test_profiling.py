@@ -0,0 +1,76 @@
+import json
+import marshal
+import pytest
+from app import profiling
+from app.extensions import db
+from app.models import Analysis
+
+ADMIN_TOKEN = 'test-admin-token'
+
+@pytest.fixture
+def config(config, tmp_path):
+    return {**config, 'ADMIN_TOKEN': ADMIN_TOKEN, 'PROFILE_FOLDER': str(tmp_path / 'profiles')}
+
+def busy_work():
+    return sum(i * i for i in range(200000))
+
+def test_should_profile():
+    assert profiling.should_profile({'profile': True}, 0.0)
+    assert not profiling.should_profile({}, 0.0)
+    assert profiling.should_profile({}, 1.0)
+
+def test_profiled_writes_speedscope(tmp_path):
+    path = profiling.artifact_path(str(tmp_path), 1, 'speedscope')
+    with profiling.profiled(path, 'speedscope', 0.001):
+        busy_work()
+    with open(path) as f:
+        assert 'speedscope' in json.load(f)['$schema']
+
+def test_profiled_writes_pstats(tmp_path):
+    path = profiling.artifact_path(str(tmp_path), 1, 'pstats')
+    with profiling.profiled(path, 'pstats', 0.001):
+        busy_work()
+    with open(path, 'rb') as f:
+        assert isinstance(marshal.load(f), dict)
+
+def test_profiled_without_path_is_noop():
+    with profiling.profiled(None, 'speedscope', 0.001):
+        busy_work()
+
+def test_unknown_profile_format(tmp_path):
+    with pytest.raises(ValueError):
+        profiling.artifact_path(str(tmp_path), 1, 'flamegraph.svg')
+
+def test_profile_endpoint_requires_token(client):
+    analysis = Analysis(url='https://test.com/audio')
+    db.session.add(analysis)
+    db.session.commit()
+
+    response = client.get(f'/api/admin/analysis/{analysis.id}/profile')
+    assert response.status_code == 403
+
+    response = client.get(f'/api/admin/analysis/{analysis.id}/profile',
+                          headers={'X-Admin-Token': 'wrong'})
+    assert response.status_code == 403
+
+def test_profile_endpoint_serves_artifact(app, client):
+    path = profiling.artifact_path(app.config['PROFILE_FOLDER'], 1, 'speedscope')
+    with profiling.profiled(path, 'speedscope', 0.001):
+        busy_work()
+    analysis = Analysis(url='https://test.com/audio', options={'profile': True}, profile_path=path)
+    db.session.add(analysis)
+    db.session.commit()
+
+    response = client.get(f'/api/admin/analysis/{analysis.id}/profile',
+                          headers={'X-Admin-Token': ADMIN_TOKEN})
+    assert response.status_code == 200
+    assert 'speedscope' in json.loads(response.get_data())['$schema']
+
+def test_profile_endpoint_missing_artifact(client):
+    analysis = Analysis(url='https://test.com/audio')
+    db.session.add(analysis)
+    db.session.commit()
+
+    response = client.get(f'/api/admin/analysis/{analysis.id}/profile',
+                          headers={'X-Admin-Token': ADMIN_TOKEN})
+    assert response.status_code == 404
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app import scheduling
+from app.extensions import db
+from app.models import Analysis
+from app.tasks import dispatch_queued_analyses, probe_analysis, process_audio_url
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+POLICY = {'aging_rate': 2.0, 'fairness_penalty': 1800, 'unknown_duration': 3600}
+
+def job(id, minutes, waited=0, client='a'):
+    return SimpleNamespace(
+        id=id,
+        client_id=client,
+        source_duration=None if minutes is None else minutes * 60.0,
+        created_at=NOW - timedelta(seconds=waited),
+    )
+
+def ids(analyses):
+    return [analysis.id for analysis in analyses]
+
+def test_shortest_job_first():
+    candidates = [job(1, 240), job(2, 30), job(3, 60)]
+    assert ids(scheduling.pick_next(candidates, {}, NOW, 3, **POLICY)) == [2, 3, 1]
+
+def test_limited_by_free_slots():
+    candidates = [job(1, 240), job(2, 30), job(3, 60)]
+    assert ids(scheduling.pick_next(candidates, {}, NOW, 1, **POLICY)) == [2]
+    assert scheduling.pick_next(candidates, {}, NOW, 0, **POLICY) == []
+
+def test_aging_prevents_starvation():
+    # A 4h set that has waited 2h beats a fresh 30 minute mix
+    candidates = [job(1, 240, waited=2 * 3600), job(2, 30)]
+    assert ids(scheduling.pick_next(candidates, {}, NOW, 1, **POLICY)) == [1]
+
+def test_unknown_duration_is_assumed():
+    candidates = [job(1, None), job(2, 45), job(3, 90)]
+    assert ids(scheduling.pick_next(candidates, {}, NOW, 3, **POLICY)) == [2, 1, 3]
+
+def test_fair_between_clients():
+    # Client a floods the queue with short mixes; client b still gets a slot
+    candidates = [job(i, 20, client='a') for i in range(1, 6)] + [job(6, 45, client='b')]
+    assert ids(scheduling.pick_next(candidates, {}, NOW, 3, **POLICY)) == [1, 6, 2]
+    # With two of its jobs already running, b goes first
+    assert ids(scheduling.pick_next(candidates, {'a': 2}, NOW, 1, **POLICY)) == [6]
+
+
+@pytest.fixture
+def config(config):
+    return {**config, 'SCHEDULER_MAX_IN_FLIGHT': 2}
+
+def test_dispatch_fills_free_slots(app, dispatched):
+    running = Analysis(url='https://test.com/running', status='processing',
+                       client_id='a', dispatched_at=datetime.utcnow())
+    long_set = Analysis(url='https://test.com/long', status='queued', client_id='b', source_duration=14400)
+    short_mix = Analysis(url='https://test.com/short', status='queued', client_id='c', source_duration=1800)
+    db.session.add_all([running, long_set, short_mix])
+    db.session.commit()
+
+    dispatch_queued_analyses(app.config)
+    assert dispatched == [short_mix.id]
+    assert short_mix.dispatched_at is not None
+    assert long_set.dispatched_at is None
+
+    # No free slots until something finishes
+    dispatch_queued_analyses(app.config)
+    assert dispatched == [short_mix.id]
+
+    running.status = 'completed'
+    db.session.commit()
+    dispatch_queued_analyses(app.config)
+    assert dispatched == [short_mix.id, long_set.id]
+
+def test_probe_records_metadata_and_dispatches(app, dispatched, monkeypatch):
+    monkeypatch.setattr('app.tasks.probe_source',
+                        lambda url: {'duration': 3600.0, 'filesize_approx': 57600000})
+    analysis = Analysis(url='https://test.com/mix', client_id='a')
+    db.session.add(analysis)
+    db.session.commit()
+
+    probe_analysis.apply(args=[analysis.id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis.id)
+    assert analysis.status == 'queued'
+    assert analysis.source_duration == 3600.0
+    assert analysis.source_size == 57600000
+    assert analysis.dispatched_at is not None
+    assert dispatched == [analysis.id]
+
+def test_failed_probe_still_queues(app, dispatched, monkeypatch):
+    def unreachable(url):
+        raise OSError('ffprobe not found')
+    monkeypatch.setattr('app.tasks.probe_source', unreachable)
+    analysis = Analysis(url='https://test.com/mix', client_id='a')
+    db.session.add(analysis)
+    db.session.commit()
+
+    probe_analysis.apply(args=[analysis.id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis.id)
+    assert analysis.status == 'queued'
+    assert analysis.source_duration is None
+    assert dispatched == [analysis.id]
+
+def test_failed_publish_frees_the_slot(app, monkeypatch):
+    def broker_down(analysis_id):
+        raise ConnectionError('broker unreachable')
+    monkeypatch.setattr(process_audio_url, 'delay', broker_down)
+    analysis = Analysis(url='https://test.com/mix', status='queued', client_id='a')
+    db.session.add(analysis)
+    db.session.commit()
+
+    assert dispatch_queued_analyses(app.config) == []
+    db.session.expire_all()
+    assert db.session.get(Analysis, analysis.id).dispatched_at is None
+
+def test_abandoned_job_frees_its_slot(app, dispatched):
+    # A job that exhausted its attempts still hands its slot to the next one
+    abandoned = Analysis(url='https://test.com/oom', status='processing', client_id='a',
+                         dispatched_at=datetime.utcnow(),
+                         checkpoint={'attempts': app.config['TASK_MAX_ATTEMPTS']})
+    waiting = [Analysis(url=f'https://test.com/{i}', status='queued', client_id='b') for i in range(2)]
+    db.session.add_all([abandoned, *waiting])
+    db.session.commit()
+
+    process_audio_url.apply(args=[abandoned.id])
+    db.session.expire_all()
+    assert db.session.get(Analysis, abandoned.id).status == 'failed'
+    assert sorted(dispatched) == [analysis.id for analysis in waiting]
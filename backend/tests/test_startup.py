@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_create_app_does_not_import_worker_modules():
+    # A fresh interpreter, since the test session itself imports app.tasks
+    output = subprocess.run(
+        [sys.executable, '-c', (
+            "import sys\n"
+            "from app import create_app\n"
+            "create_app()\n"
+            "print(' '.join(m for m in ('librosa', 'numpy', 'pyarrow', 'yt_dlp', 'structlog', 'app.tasks')"
+            " if m in sys.modules))\n"
+        )],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == ''
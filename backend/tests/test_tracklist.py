@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+import soundfile as sf
+from app import tracklist
+from app.extensions import db
+from app.models import Analysis
+from app.tasks import probe_analysis, process_audio_url
+from .conftest import SR
+
+DESCRIPTION = """Recorded live at the warehouse.
+
+Tracklist:
+00:00 Intro
+1. Artist One - First Track (0:45)
+[1:30] Artist Two – Second Track
+2:40 | Artist Three - Third Track
+
+Follow us for more mixes!"""
+
+def test_parse_description():
+    entries = tracklist.parse_description(DESCRIPTION, 200.0)
+    assert entries == [
+        {'start_time': 0.0, 'end_time': 45.0, 'title': 'Intro'},
+        {'start_time': 45.0, 'end_time': 90.0, 'title': 'Artist One - First Track'},
+        {'start_time': 90.0, 'end_time': 160.0, 'title': 'Artist Two – Second Track'},
+        {'start_time': 160.0, 'end_time': 200.0, 'title': 'Artist Three - Third Track'},
+    ]
+
+def test_parse_description_hours():
+    description = "0:00:00 Opener\n0:59:30 Middle\n1:02:03 Closer"
+    entries = tracklist.parse_description(description, 4000.0)
+    assert [entry['start_time'] for entry in entries] == [0.0, 3570.0, 3723.0]
+
+def test_description_must_fit_the_mix():
+    # Out of order, or past the end: not a tracklist for this mix
+    assert tracklist.parse_description("02:00 B\n01:00 A", 300.0) == []
+    assert tracklist.parse_description("00:00 A\n10:00 B", 300.0) == []
+    assert tracklist.parse_description(DESCRIPTION, None) == []
+
+def test_chapters_preferred_over_description():
+    info = {
+        'duration': 200.0,
+        'description': DESCRIPTION,
+        'chapters': [
+            {'start_time': 0.0, 'end_time': 100.0, 'title': 'Part one'},
+            {'start_time': 100.0, 'end_time': 200.0, 'title': ''},
+        ],
+    }
+    entries, track_type, confidence = tracklist.metadata_tracklist(info)
+    assert track_type == 'chapter'
+    assert confidence == tracklist.CHAPTER_CONFIDENCE
+    assert [entry['title'] for entry in entries] == ['Part one', 'Track 2']
+
+def test_no_tracklist():
+    info = {'duration': 200.0, 'description': 'Best mix ever, starts at 00:30', 'chapters': None}
+    assert tracklist.metadata_tracklist(info) == ([], None, None)
+
+
+@pytest.fixture
+def config(config):
+    return {**config, 'METADATA_REFINE_WINDOW': 5.0}
+
+@pytest.fixture(autouse=True)
+def probe_source(monkeypatch):
+    monkeypatch.setattr('app.tasks.probe_source', lambda url: {
+        'duration': 40.0,
+        'description': "00:00 Artist One - Opener\n00:20 Artist Two - Closer",
+    })
+
+def submit(options=None):
+    analysis = Analysis(url='https://test.com/mix', client_id='a', options=options)
+    db.session.add(analysis)
+    db.session.commit()
+    probe_analysis.apply(args=[analysis.id])
+    db.session.expire_all()
+    return db.session.get(Analysis, analysis.id)
+
+def test_probe_completes_from_tracklist(app, dispatched):
+    analysis = submit()
+    assert analysis.status == 'completed'
+    assert dispatched == []
+    assert [(t.title, t.start_time, t.end_time, t.track_type) for t in analysis.tracks] == [
+        ('Artist One - Opener', 0.0, 20.0, 'tracklist'),
+        ('Artist Two - Closer', 20.0, 40.0, 'tracklist'),
+    ]
+
+def test_probe_ignores_tracklist(app, dispatched):
+    analysis = submit({'metadata': 'ignore'})
+    assert analysis.status == 'queued'
+    assert analysis.tracks == []
+    assert dispatched == [analysis.id]
+
+def test_refine_moves_boundaries_to_onsets(app, dispatched, monkeypatch):
+    analysis = submit({'metadata': 'refine'})
+    assert analysis.status == 'queued'
+    assert analysis.checkpoint == {'metadata_tracklist': True}
+    assert dispatched == [analysis.id]
+
+    # The actual transition is at 22s, not the 20s the description claims
+    def fake_download(url, output_path, sample_rate=None, mono=False):
+        y = np.zeros(SR * 40, dtype=np.float32)
+        y[22 * SR:22 * SR + SR // 100] = 0.9
+        sf.write(output_path + '.wav', y, SR)
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr('app.tasks.segment_onsets', lambda *args, **kwargs: 1 / 0)
+
+    process_audio_url.apply(args=[analysis.id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    first, second = sorted(analysis.tracks, key=lambda track: track.start_time)
+    assert first.end_time == second.start_time
+    assert second.start_time == pytest.approx(22.0, abs=0.1)
+    assert second.title == 'Artist Two - Closer'
+    # Features come from the same decoded mix
+    assert all(track.loudness is not None for track in analysis.tracks)
+
+def test_refine_without_features_skips_decoding(app, dispatched, monkeypatch):
+    analysis = submit({'metadata': 'refine', 'features': []})
+
+    def fake_download(url, output_path, sample_rate=None, mono=False):
+        sf.write(output_path + '.wav', np.zeros(SR * 40, dtype=np.float32), SR)
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+    monkeypatch.setattr('app.tasks.detect_onsets', lambda *args, **kwargs: 1 / 0)
+
+    process_audio_url.apply(args=[analysis.id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert all(track.bpm is None for track in analysis.tracks)
+
+@pytest.mark.parametrize('amplitude', [0.0, 0.3])
+def test_refine_keeps_boundary_without_onset(app, dispatched, monkeypatch, amplitude):
+    # Silence, or steady noise: nothing near 20s stands out, so the claim stands
+    analysis = submit({'metadata': 'refine'})
+
+    def fake_download(url, output_path, sample_rate=None, mono=False):
+        y = np.random.default_rng(0).uniform(-amplitude, amplitude, SR * 40).astype(np.float32)
+        sf.write(output_path + '.wav', y, SR)
+    monkeypatch.setattr('app.tasks.download_audio', fake_download)
+
+    process_audio_url.apply(args=[analysis.id])
+    db.session.expire_all()
+    analysis = db.session.get(Analysis, analysis.id)
+    assert analysis.status == 'completed', analysis.error_message
+    assert sorted(track.start_time for track in analysis.tracks) == [0.0, 20.0]
@@ -6,6 +6,7 @@ import { Analysis } from '@/types';
 export default function AnalysisPage({ params }: { params: { id: string } }) {
   const [analysis, setAnalysis] = useState<Analysis | null>(null);
   const [error, setError] = useState('');
+  const finished = analysis?.status === 'completed' || analysis?.status === 'failed';
 
   useEffect(() => {
     const fetchAnalysis = async () => {
@@ -21,16 +22,13 @@ export default function AnalysisPage({ params }: { params: { id: string } }) {
       }
     };
 
-    const pollAnalysis = () => {
-      if (analysis?.status === 'pending' || analysis?.status === 'processing') {
-        const timer = setTimeout(fetchAnalysis, 5000);
-        return () => clearTimeout(timer);
-      }
-    };
-
     fetchAnalysis();
-    return pollAnalysis();
-  }, [params.id, analysis?.status]);
+    // Queued and live analyses can keep their status for hours; poll until it's final
+    if (!finished) {
+      const timer = setInterval(fetchAnalysis, 5000);
+      return () => clearInterval(timer);
+    }
+  }, [params.id, finished]);
 
   const handleDownload = async (trackId: number) => {
     try {
@@ -5,19 +5,38 @@ export interface Track {
   start_time: number;
   end_time: number;
   confidence: number;
-  track_type: 'full_track' | 'onset_based' | 'final_segment';
+  track_type: 'full_track' | 'onset_based' | 'final_segment' | 'chapter' | 'tracklist';
   file_path: string | null;
+  bpm: number | null;
+  first_beat: number | null;  // beats follow every 60 / bpm seconds
+  key: string | null;
+  loudness: number | null;
+  spectral_centroid: number | null;
   created_at: string;
 }
 
 export interface Analysis {
   id: number;
   url: string;
-  status: 'pending' | 'processing' | 'completed' | 'failed';
+  status: 'pending' | 'queued' | 'processing' | 'live' | 'completed' | 'failed';
   created_at: string;
   started_at: string | null;
   completed_at: string | null;
   duration: number | null;
+  source_duration: number | null;
+  source_size: number | null;
   error_message: string | null;
   tracks: Track[];
 }
+
+export interface PeakLevel {
+  level: number;
+  samples_per_peak: number;
+  length: number;
+}
+
+export interface PeaksIndex {
+  sample_rate: number;
+  bits: 8 | 16;
+  levels: PeakLevel[];
+}